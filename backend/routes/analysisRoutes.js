@@ -4,9 +4,11 @@ const multer = require("multer");
 const { spawn } = require("child_process");
 const path = require("path");
 const fs = require("fs");
+const crypto = require("crypto");
 const jwt = require("jsonwebtoken");
 const Submission = require("../models/Submission");
 const { authenticate } = require("../middleware/auth");
+const liveEngine = require("../utils/liveEngine");
 
 // Ensure uploads directory exists
 const uploadsDir = path.join(__dirname, "../uploads/videos");
@@ -119,12 +121,26 @@ router.post("/analyze-video", upload.single("video"), async (req, res) => {
 // Live analysis endpoint - DEMO VERSION
 router.post("/analyze-live", async (req, res) => {
   try {
-    const { exerciseType } = req.body;
-    const sessionId = Date.now().toString();
+    const { exerciseType, age, gender, fps } = req.body;
+    const sessionId = crypto.randomUUID();
 
-    console.log(
-      `DEMO: Starting live analysis session for ${exerciseType}, session ID: ${sessionId}`
-    );
+    if (liveEngine.isEnabled()) {
+      const started = await liveEngine.startSession(
+        sessionId,
+        convertExerciseType(exerciseType),
+        { age, gender, fps }
+      );
+      if (!started.success) {
+        return res.status(400).json({
+          error: "Live analysis failed",
+          message: started.error,
+        });
+      }
+    } else {
+      console.log(
+        `DEMO: Starting live analysis session for ${exerciseType}, session ID: ${sessionId}`
+      );
+    }
 
     res.json({
       success: true,
@@ -142,11 +158,98 @@ router.post("/analyze-live", async (req, res) => {
   }
 });
 
-// Process live camera frame
+// Forward one frame to the live engine and shape its reply for the frontend
+async function sendEngineFrame(res, sessionId, exerciseType, frame, format) {
+  const engineResults = await liveEngine.processFrame(sessionId, frame, format);
+  if (!engineResults.success) {
+    return res.status(400).json({
+      error: "Frame processing failed",
+      message: engineResults.error,
+    });
+  }
+
+  const landmarks = engineResults.landmarks;
+  const formScore = engineResults.cheat_detected ? 40 : 90;
+  return res.json({
+    success: true,
+    results: {
+      sessionId,
+      exerciseType: exerciseType || engineResults.exercise_type,
+      repCount: engineResults.total_reps ?? engineResults.jump_count ?? 0,
+      formScore,
+      currentStage: engineResults.stage || engineResults.left_stage || "ready",
+      formStatus: engineResults.cheat_detected ? "bad" : "good",
+      confidence: landmarks.length
+        ? landmarks.reduce((sum, lm) => sum + lm.visibility, 0) /
+          landmarks.length
+        : 0,
+      timestamp: Date.now(),
+      poseDetected: engineResults.pose_detected,
+      cheatDetected: engineResults.cheat_detected,
+      landmarks,
+    },
+  });
+}
+
+// Process live camera frame sent as a binary body: image/jpeg, or raw BGR
+// (application/octet-stream) with X-Frame-Width / X-Frame-Height headers.
+// The bytes are forwarded to the live engine as-is, without JSON or base64.
+router.post(
+  "/process-frame/:sessionId",
+  express.raw({
+    type: ["image/jpeg", "application/octet-stream"],
+    limit: "25mb",
+  }),
+  async (req, res) => {
+    try {
+      if (!liveEngine.isEnabled()) {
+        return res
+          .status(501)
+          .json({ error: "Binary frames require the live engine" });
+      }
+      if (!Buffer.isBuffer(req.body) || req.body.length === 0) {
+        return res.status(400).json({ error: "No frame data" });
+      }
+
+      const format = req.is("image/jpeg")
+        ? { encoding: liveEngine.ENCODING_JPEG }
+        : {
+            encoding: liveEngine.ENCODING_BGR,
+            width: parseInt(req.get("X-Frame-Width"), 10) || 0,
+            height: parseInt(req.get("X-Frame-Height"), 10) || 0,
+          };
+      await sendEngineFrame(
+        res,
+        req.params.sessionId,
+        req.get("X-Exercise-Type"),
+        req.body,
+        format
+      );
+    } catch (error) {
+      console.error("Frame processing error:", error);
+      res.status(500).json({
+        error: "Frame processing failed",
+        message: error.message,
+      });
+    }
+  }
+);
+
+// Process live camera frame (JSON body with a base64 data URL)
 router.post("/process-frame", async (req, res) => {
   try {
     const { sessionId, frameData, exerciseType } = req.body;
 
+    if (liveEngine.isEnabled()) {
+      const jpeg = Buffer.from(
+        frameData.slice(frameData.indexOf(",") + 1),
+        "base64"
+      );
+      return await sendEngineFrame(res, sessionId, exerciseType, jpeg, {
+        encoding: liveEngine.ENCODING_JPEG,
+      });
+    }
+
     console.log(
       `DEMO: Processing frame for session ${sessionId}, exercise: ${exerciseType}`
     );
@@ -184,6 +287,30 @@ router.post("/process-frame", async (req, res) => {
   }
 });
 
+// End live analysis session
+router.post("/end-live-session", async (req, res) => {
+  try {
+    const { sessionId } = req.body;
+
+    if (!liveEngine.isEnabled()) {
+      return res.json({ success: true, sessionId });
+    }
+
+    const results = await liveEngine.endSession(sessionId);
+    res.json({
+      success: results.success,
+      sessionId,
+      analysisResults: results,
+    });
+  } catch (error) {
+    console.error("End live session error:", error);
+    res.status(500).json({
+      error: "Failed to end live session",
+      message: error.message,
+    });
+  }
+});
+
 // Helper function to generate fake pose landmarks for demo
 function generateFakeLandmarks() {
   // Generate fake pose landmarks for demo purposes
@@ -0,0 +1,176 @@
+const net = require("net");
+
+// Binary frame transport to the Python live engine (model/live_engine.py).
+// Requests: 10-byte header (type u8, encoding u8, width u16, height u16,
+// length u32, little-endian) + payload. Replies: u32 length + JSON.
+const MSG_START = 1;
+const MSG_FRAME = 2;
+const MSG_END = 3;
+const ENCODING_NONE = 0;
+const ENCODING_JPEG = 1;
+const ENCODING_BGR = 2;
+const HEADER_SIZE = 10;
+// Rate at which the frontend captures live frames (LIVE_CAPTURE_FPS)
+const DEFAULT_CAPTURE_FPS = 10;
+
+const socketPath = process.env.LIVE_ENGINE_SOCKET;
+// Sessions the client abandons (tab closed, no end-live-session) are closed
+// after this long without a request
+const idleTimeoutMs =
+  parseInt(process.env.LIVE_ENGINE_IDLE_TIMEOUT_MS, 10) || 60000;
+const sessions = new Map();
+
+function isEnabled() {
+  return Boolean(socketPath);
+}
+
+function createHeader(type, encoding, width, height, length) {
+  const header = Buffer.allocUnsafe(HEADER_SIZE);
+  header.writeUInt8(type, 0);
+  header.writeUInt8(encoding, 1);
+  header.writeUInt16LE(width, 2);
+  header.writeUInt16LE(height, 4);
+  header.writeUInt32LE(length, 6);
+  return header;
+}
+
+// One engine connection per live session; replies arrive in request order
+function connect(sessionId) {
+  return new Promise((resolve, reject) => {
+    const socket = net.createConnection(socketPath);
+    const session = {
+      socket,
+      pending: [],
+      received: Buffer.alloc(0),
+      idleTimer: null,
+    };
+
+    socket.on("connect", () => resolve(session));
+    socket.on("data", (chunk) => {
+      session.received = Buffer.concat([session.received, chunk]);
+      while (session.received.length >= 4) {
+        const length = session.received.readUInt32LE(0);
+        if (session.received.length < 4 + length) break;
+        const body = session.received.subarray(4, 4 + length).toString("utf8");
+        session.received = session.received.subarray(4 + length);
+        const request = session.pending.shift();
+        if (request) request.resolve(JSON.parse(body));
+      }
+    });
+    socket.on("error", (error) => {
+      session.pending.forEach((request) => request.reject(error));
+      session.pending = [];
+      sessions.delete(sessionId);
+      reject(error);
+    });
+    socket.on("close", () => {
+      clearTimeout(session.idleTimer);
+      session.pending.forEach((request) =>
+        request.reject(new Error("Live engine connection closed"))
+      );
+      session.pending = [];
+      if (sessions.get(sessionId) === session) sessions.delete(sessionId);
+    });
+  });
+}
+
+// Drop the session and its engine connection without waiting for a reply
+function closeSession(sessionId) {
+  const session = sessions.get(sessionId);
+  if (!session) return;
+  clearTimeout(session.idleTimer);
+  sessions.delete(sessionId);
+  session.socket.destroy();
+}
+
+function resetIdleTimer(sessionId, session) {
+  clearTimeout(session.idleTimer);
+  session.idleTimer = setTimeout(() => {
+    console.log(`Closing idle live session ${sessionId}`);
+    closeSession(sessionId);
+  }, idleTimeoutMs);
+  session.idleTimer.unref();
+}
+
+function send(session, type, payload, format = {}) {
+  const { encoding = ENCODING_NONE, width = 0, height = 0 } = format;
+  return new Promise((resolve, reject) => {
+    session.pending.push({ resolve, reject });
+    session.socket.write(
+      createHeader(type, encoding, width, height, payload.length)
+    );
+    if (payload.length > 0) session.socket.write(payload);
+  });
+}
+
+// options: fps is the rate frames are captured at, which the engine needs
+// for time-based windows; with age and gender set the final results
+// include benchmark percentiles
+async function startSession(sessionId, exerciseType, options = {}) {
+  const session = await connect(sessionId);
+  sessions.set(sessionId, session);
+  resetIdleTimer(sessionId, session);
+  const start = Buffer.from(
+    JSON.stringify({
+      exercise_type: exerciseType,
+      fps: Number(options.fps) || DEFAULT_CAPTURE_FPS,
+      age: options.age,
+      gender: options.gender,
+    })
+  );
+  try {
+    const started = await send(session, MSG_START, start);
+    if (!started.success) closeSession(sessionId);
+    return started;
+  } catch (error) {
+    closeSession(sessionId);
+    throw error;
+  }
+}
+
+// frame is a Buffer holding a JPEG (ENCODING_JPEG) or raw BGR pixels
+// (ENCODING_BGR with width and height); it is written to the socket as-is.
+async function processFrame(
+  sessionId,
+  frame,
+  format = { encoding: ENCODING_JPEG }
+) {
+  const session = sessions.get(sessionId);
+  if (!session) {
+    throw new Error(`Unknown live session: ${sessionId}`);
+  }
+  if (
+    format.encoding === ENCODING_BGR &&
+    frame.length !== format.width * format.height * 3
+  ) {
+    throw new Error(
+      `Raw frame size ${frame.length} does not match ${format.width}x${format.height}`
+    );
+  }
+  resetIdleTimer(sessionId, session);
+  return send(session, MSG_FRAME, frame, format);
+}
+
+async function endSession(sessionId) {
+  const session = sessions.get(sessionId);
+  if (!session) {
+    throw new Error(`Unknown live session: ${sessionId}`);
+  }
+  clearTimeout(session.idleTimer);
+  try {
+    return await send(session, MSG_END, Buffer.alloc(0));
+  } finally {
+    sessions.delete(sessionId);
+    session.socket.end();
+  }
+}
+
+module.exports = {
+  ENCODING_JPEG,
+  ENCODING_BGR,
+  isEnabled,
+  startSession,
+  processFrame,
+  endSession,
+  closeSession,
+};
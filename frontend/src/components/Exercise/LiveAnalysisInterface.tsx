@@ -16,7 +16,11 @@ import {
   Video,
   ArrowLeft,
 } from "lucide-react";
-import { cameraService, CameraService } from "@/services/camera";
+import {
+  cameraService,
+  CameraService,
+  LIVE_CAPTURE_FPS,
+} from "@/services/camera";
 import { LiveAnalysisSocket, analysisAPI } from "@/services/api";
 import { PoseOverlay } from "./PoseOverlay";
 import { MetricsDashboard } from "./MetricsDashboard";
@@ -307,8 +311,8 @@ export function LiveAnalysisInterface({
       }
     };
 
-    // Capture frames at 10 FPS for analysis
-    const frameInterval = setInterval(captureFrame, 100);
+    // Capture frames at LIVE_CAPTURE_FPS; the engine's time windows rely on it
+    const frameInterval = setInterval(captureFrame, 1000 / LIVE_CAPTURE_FPS);
 
     return () => clearInterval(frameInterval);
   }, [isAnalyzing]);
@@ -1,4 +1,6 @@
 // API service for exercise analysis platform
+import { LIVE_CAPTURE_FPS } from "./camera";
+
 const API_BASE_URL =
   import.meta.env.VITE_API_URL || "http://localhost:5000/api";
 
@@ -42,8 +44,8 @@ const apiRequest = async (endpoint: string, options: RequestInit = {}) => {
     ...(options.headers as Record<string, string>),
   };
 
-  // Only set Content-Type if not uploading files
-  if (!(options.body instanceof FormData)) {
+  // Only set Content-Type if not uploading files or sending binary frames
+  if (!(options.body instanceof FormData) && !headers["Content-Type"]) {
     headers["Content-Type"] = "application/json";
   }
 
@@ -298,10 +300,13 @@ export const analysisAPI = {
   },
 
   // Live analysis functions
-  startLiveSession: async (exerciseType: string) => {
+  startLiveSession: async (
+    exerciseType: string,
+    options?: { age?: number; gender?: string; fps?: number }
+  ) => {
     return apiRequest("/analysis/analyze-live", {
       method: "POST",
-      body: JSON.stringify({ exerciseType }),
+      body: JSON.stringify({ exerciseType, fps: LIVE_CAPTURE_FPS, ...options }),
     });
   },
 
@@ -320,6 +325,31 @@ export const analysisAPI = {
     });
   },
 
+  // Binary frame upload: a JPEG blob, or raw BGR pixels with their size.
+  // Avoids the base64 data URL and JSON body of processFrame.
+  processFrameBinary: async (
+    sessionId: string,
+    frame: Blob | { data: Uint8Array; width: number; height: number },
+    exerciseType: string
+  ) => {
+    const headers: Record<string, string> = { "X-Exercise-Type": exerciseType };
+    let body: BodyInit;
+    if (frame instanceof Blob) {
+      headers["Content-Type"] = "image/jpeg";
+      body = frame;
+    } else {
+      headers["Content-Type"] = "application/octet-stream";
+      headers["X-Frame-Width"] = String(frame.width);
+      headers["X-Frame-Height"] = String(frame.height);
+      body = frame.data;
+    }
+    return apiRequest(`/analysis/process-frame/${sessionId}`, {
+      method: "POST",
+      headers,
+      body,
+    });
+  },
+
   endLiveSession: async (
     sessionId: string,
     finalResults?: Record<string, unknown>
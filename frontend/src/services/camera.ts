@@ -1,4 +1,7 @@
 // Camera and media handling service
+
+// Rate at which live analysis frames are captured and sent to the backend
+export const LIVE_CAPTURE_FPS = 10;
 export interface CameraOptions {
   width?: number;
   height?: number;
@@ -103,6 +106,45 @@ export class CameraService {
     return canvas.toDataURL('image/jpeg', 0.8);
   }
 
+  captureFrameBlob(videoElement: HTMLVideoElement): Promise<Blob> {
+    const canvas = this.drawFrame(videoElement);
+    return new Promise((resolve, reject) => {
+      canvas.toBlob(
+        (blob) => (blob ? resolve(blob) : reject(new Error('Frame capture failed'))),
+        'image/jpeg',
+        0.8
+      );
+    });
+  }
+
+  // Raw BGR pixels in the row order the live engine expects
+  captureFrameBGR(videoElement: HTMLVideoElement): { data: Uint8Array; width: number; height: number } {
+    const canvas = this.drawFrame(videoElement);
+    const { width, height } = canvas;
+    const rgba = canvas.getContext('2d')!.getImageData(0, 0, width, height).data;
+    const data = new Uint8Array(width * height * 3);
+    for (let src = 0, dst = 0; src < rgba.length; src += 4, dst += 3) {
+      data[dst] = rgba[src + 2];
+      data[dst + 1] = rgba[src + 1];
+      data[dst + 2] = rgba[src];
+    }
+    return { data, width, height };
+  }
+
+  private drawFrame(videoElement: HTMLVideoElement): HTMLCanvasElement {
+    const canvas = document.createElement('canvas');
+    const context = canvas.getContext('2d');
+
+    if (!context) {
+      throw new Error('Canvas context not available');
+    }
+
+    canvas.width = videoElement.videoWidth;
+    canvas.height = videoElement.videoHeight;
+    context.drawImage(videoElement, 0, 0, canvas.width, canvas.height);
+    return canvas;
+  }
+
   async getAvailableDevices(): Promise<MediaDeviceInfo[]> {
     const devices = await navigator.mediaDevices.enumerateDevices();
     return devices.filter(device => device.kind === 'videoinput');
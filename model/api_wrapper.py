@@ -6,12 +6,237 @@ import numpy as np
 import time
 import os
 
-# Import functions from the main code
-from code import calculate_angle, check_bicep_form
+# Import shared angle and form helpers
+from exercise_utils import calculate_angle, check_bicep_form
+from quality_monitor import QualityMonitor, frame_hash, landmark_visibility
+from benchmarks import add_benchmark
+from session_recorder import SessionRecorder, recording_path
 
-def run_video_analysis(exercise_type, video_path):
+mp_pose = mp.solutions.pose
+
+def get_point(landmarks, landmark):
+    """Return the [x, y] coordinates of a MediaPipe pose landmark."""
+    return [landmarks[landmark.value].x, landmarks[landmark.value].y]
+
+class ExerciseAnalyzer:
+    """
+    Per-frame rep counting and cheat detection for one exercise session.
+
+    Fed one MediaPipe pose result at a time, so the same scoring logic is
+    shared by file analysis, the live engine and session replay.
+    """
+
+    def __init__(self, exercise_type, fps=30):
+        if exercise_type not in ('BICEP_CURLS', 'SITUPS', 'VERTICAL_JUMP'):
+            raise ValueError(f"Unsupported exercise type: {exercise_type}")
+        
+        self.exercise_type = exercise_type
+        self.frame_count = 0
+        self.form_issues = []
+        self.quality_monitor = QualityMonitor(exercise_type, fps=fps)
+        self.quality_status = None
+        self._visibility_buffer = np.empty(33, dtype=np.float32)
+        
+        # Bicep curl state
+        self.left_counter = 0
+        self.right_counter = 0
+        self.left_stage = None
+        self.right_stage = None
+        
+        # Sit-up state
+        self.counter = 0
+        self.stage = None
+        
+        # Vertical jump state
+        self.max_height_cm = 0
+        self.jump_count = 0
+        self.baseline_y = None
+        self.current_jump_height = 0
+
+    def process(self, pose_landmarks, frame=None, digest=None):
+        """
+        Update the session with one frame's pose landmarks.
+
+        Args:
+            pose_landmarks: MediaPipe ``pose_landmarks`` result (or None).
+            frame (np.ndarray): Optional raw frame for frozen/loop detection.
+            digest (int): Precomputed frame hash used instead of ``frame``.
+        """
+        self.frame_count += 1
+        
+        # Rolling-window quality and cheat detection
+        visibility = landmark_visibility(pose_landmarks, self._visibility_buffer)
+        self.quality_status = self.quality_monitor.update(visibility, frame, digest)
+        
+        if not pose_landmarks:
+            return
+        
+        landmarks = pose_landmarks.landmark
+        
+        if self.exercise_type == 'BICEP_CURLS':
+            left_shoulder = get_point(landmarks, mp_pose.PoseLandmark.LEFT_SHOULDER)
+            left_elbow = get_point(landmarks, mp_pose.PoseLandmark.LEFT_ELBOW)
+            left_wrist = get_point(landmarks, mp_pose.PoseLandmark.LEFT_WRIST)
+            left_hip = get_point(landmarks, mp_pose.PoseLandmark.LEFT_HIP)
+            right_shoulder = get_point(landmarks, mp_pose.PoseLandmark.RIGHT_SHOULDER)
+            right_elbow = get_point(landmarks, mp_pose.PoseLandmark.RIGHT_ELBOW)
+            right_wrist = get_point(landmarks, mp_pose.PoseLandmark.RIGHT_WRIST)
+            
+            # Calculate angles
+            left_angle = calculate_angle(left_shoulder, left_elbow, left_wrist)
+            right_angle = calculate_angle(right_shoulder, right_elbow, right_wrist)
+            
+            # Left arm rep counting
+            if left_angle > 140:
+                self.left_stage = "down"
+            if left_angle < 50 and self.left_stage == "down":
+                self.left_stage = "up"
+                self.left_counter += 1
+            
+            # Right arm rep counting
+            if right_angle > 140:
+                self.right_stage = "down"
+            if right_angle < 50 and self.right_stage == "down":
+                self.right_stage = "up"
+                self.right_counter += 1
+            
+            # Check form using existing function
+            form_check = check_bicep_form(left_shoulder, left_elbow, left_hip, left_wrist)
+            if form_check.get('issues'):
+                self.form_issues.extend(form_check['issues'])
+                
+        elif self.exercise_type == 'SITUPS':
+            left_hip = get_point(landmarks, mp_pose.PoseLandmark.LEFT_HIP)
+            left_shoulder = get_point(landmarks, mp_pose.PoseLandmark.LEFT_SHOULDER)
+            left_knee = get_point(landmarks, mp_pose.PoseLandmark.LEFT_KNEE)
+            
+            # Calculate torso angle
+            angle = calculate_angle(left_shoulder, left_hip, left_knee)
+            
+            # Sit-up rep counting
+            if angle > 90:
+                self.stage = "down"
+            if angle < 45 and self.stage == "down":
+                self.stage = "up"
+                self.counter += 1
+                
+        elif self.exercise_type == 'VERTICAL_JUMP':
+            # Get ankle position for jump height
+            left_ankle = landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value]
+            right_ankle = landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value]
+            
+            # Use average ankle height
+            avg_ankle_y = (left_ankle.y + right_ankle.y) / 2
+            
+            # Set baseline on first frame
+            if self.frame_count == 1:
+                self.baseline_y = avg_ankle_y
+            
+            # Calculate jump height (negative because y increases downward)
+            if self.baseline_y is not None:
+                jump_height = max(0, (self.baseline_y - avg_ankle_y) * 200)  # Convert to cm approximation
+                self.current_jump_height = max(self.current_jump_height, jump_height)
+                
+                if jump_height > self.max_height_cm:
+                    self.max_height_cm = jump_height
+                
+                # Count jumps (simple threshold detection)
+                if jump_height > 15:  # Minimum jump threshold
+                    self.jump_count = 1  # For single jump analysis
+
+    def live_status(self):
+        """Snapshot of the session for live feedback after each frame."""
+        status = {
+            'exercise_type': self.exercise_type,
+            'frames_processed': self.frame_count,
+            'cheat_detected': bool(self.quality_status and self.quality_status['is_suspect']),
+            'suspect_reasons': self.quality_status['reasons'] if self.quality_status else [],
+        }
+        if self.exercise_type == 'BICEP_CURLS':
+            status.update({
+                'total_reps': self.left_counter + self.right_counter,
+                'left_reps': self.left_counter,
+                'right_reps': self.right_counter,
+                'left_stage': self.left_stage,
+                'right_stage': self.right_stage,
+            })
+        elif self.exercise_type == 'SITUPS':
+            status.update({'total_reps': self.counter, 'stage': self.stage})
+        elif self.exercise_type == 'VERTICAL_JUMP':
+            status.update({
+                'max_height_cm': round(self.max_height_cm, 2),
+                'jump_count': self.jump_count,
+            })
+        return status
+
+    def results(self):
+        """Final session results in the format returned by ``run_video_analysis``."""
+        form_issues = list(self.form_issues)
+        cheat_detected = False
+        
+        # Check for potential cheating based on windowed detection quality
+        quality = self.quality_monitor.summary()
+        detection_ratio = quality['detection_quality']
+        if quality['cheat_detected']:
+            cheat_detected = True
+            form_issues.append("Poor video quality or obstructed view detected")
+        
+        # Prepare results based on exercise type
+        if self.exercise_type == 'BICEP_CURLS':
+            total_reps = self.left_counter + self.right_counter
+            form_score = max(60, 100 - len(set(form_issues)) * 10) if not cheat_detected else 40
+            
+            return {
+                'success': True,
+                'total_reps': total_reps,
+                'left_reps': self.left_counter,
+                'right_reps': self.right_counter,
+                'form_score': form_score,
+                'consistency_score': 85 if not cheat_detected else 50,
+                'cheat_detected': cheat_detected,
+                'form_issues': list(set(form_issues)),
+                'frames_processed': self.frame_count,
+                'detection_quality': detection_ratio,
+                'suspect_segments': quality['suspect_segments']
+            }
+            
+        elif self.exercise_type == 'SITUPS':
+            form_score = max(60, 90 - len(set(form_issues)) * 10) if not cheat_detected else 40
+            
+            return {
+                'success': True,
+                'total_reps': self.counter,
+                'form_score': form_score,
+                'consistency_score': 85 if not cheat_detected else 50,
+                'cheat_detected': cheat_detected,
+                'form_issues': list(set(form_issues)),
+                'frames_processed': self.frame_count,
+                'detection_quality': detection_ratio,
+                'suspect_segments': quality['suspect_segments']
+            }
+            
+        form_score = 90 if not cheat_detected else 40
+        
+        return {
+            'success': True,
+            'max_height_cm': round(self.max_height_cm, 2),
+            'jump_count': self.jump_count,
+            'form_score': form_score,
+            'consistency_score': 85 if not cheat_detected else 50,
+            'cheat_detected': cheat_detected,
+            'frames_processed': self.frame_count,
+            'detection_quality': detection_ratio,
+            'suspect_segments': quality['suspect_segments']
+        }
+
+def run_video_analysis(exercise_type, video_path, age=None, gender=None, record_dir=None):
     """
-    Run analysis on uploaded video file and return JSON results
+    Run analysis on uploaded video file and return JSON results.
+    
+    When the athlete's age and gender are given, the result is compared
+    against the age/gender benchmarks (see ``benchmarks.py``). When
+    ``record_dir`` is given, per-frame landmarks and timings are saved
+    there for ``replay_session.py``.
     """
     results = {
         'exercise_type': exercise_type,
@@ -28,32 +253,6 @@ def run_video_analysis(exercise_type, video_path):
             results['error'] = f"Video file not found: {video_path}"
             return results
         
-        # Initialize MediaPipe
-        mp_drawing = mp.solutions.drawing_utils
-        mp_pose = mp.solutions.pose
-        
-        # Initialize exercise-specific variables
-        if exercise_type == 'BICEP_CURLS':
-            left_counter = 0
-            right_counter = 0
-            left_stage = None
-            right_stage = None
-            form_issues = []
-            cheat_detected = False
-            
-        elif exercise_type == 'SITUPS':
-            counter = 0
-            stage = None
-            form_issues = []
-            cheat_detected = False
-            
-        elif exercise_type == 'VERTICAL_JUMP':
-            max_height_cm = 0
-            jump_count = 0
-            baseline_y = None
-            cheat_detected = False
-            current_jump_height = 0
-        
         # Process video
         cap = cv2.VideoCapture(video_path)
         
@@ -61,9 +260,9 @@ def run_video_analysis(exercise_type, video_path):
             results['error'] = f"Could not open video file: {video_path}"
             return results
         
-        frame_count = 0
-        low_confidence_frames = 0
         fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        analyzer = ExerciseAnalyzer(exercise_type, fps=fps)
+        recorder = SessionRecorder(exercise_type, fps=fps, source=video_path) if record_dir else None
         
         with mp_pose.Pose(
             min_detection_confidence=0.5, 
@@ -75,185 +274,43 @@ def run_video_analysis(exercise_type, video_path):
                 if not ret:
                     break
                 
-                frame_count += 1
-                
                 # Convert image to RGB
                 image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 image.flags.writeable = False
                 
                 # Process frame with MediaPipe
+                inference_start = time.perf_counter()
                 pose_results = pose.process(image)
+                inference_seconds = time.perf_counter() - inference_start
                 
-                if pose_results.pose_landmarks:
-                    landmarks = pose_results.pose_landmarks.landmark
-                    
-                    # Exercise-specific processing
-                    if exercise_type == 'BICEP_CURLS':
-                        # Get left arm landmarks
-                        left_shoulder = [
-                            landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                            landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y
-                        ]
-                        left_elbow = [
-                            landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].x,
-                            landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].y
-                        ]
-                        left_wrist = [
-                            landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].x,
-                            landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].y
-                        ]
-                        left_hip = [
-                            landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].x,
-                            landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].y
-                        ]
-                        
-                        # Get right arm landmarks
-                        right_shoulder = [
-                            landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x,
-                            landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y
-                        ]
-                        right_elbow = [
-                            landmarks[mp_pose.PoseLandmark.RIGHT_ELBOW.value].x,
-                            landmarks[mp_pose.PoseLandmark.RIGHT_ELBOW.value].y
-                        ]
-                        right_wrist = [
-                            landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value].x,
-                            landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value].y
-                        ]
-                        right_hip = [
-                            landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value].x,
-                            landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value].y
-                        ]
-                        
-                        # Calculate angles
-                        left_angle = calculate_angle(left_shoulder, left_elbow, left_wrist)
-                        right_angle = calculate_angle(right_shoulder, right_elbow, right_wrist)
-                        
-                        # Left arm rep counting
-                        if left_angle > 140:
-                            left_stage = "down"
-                        if left_angle < 50 and left_stage == "down":
-                            left_stage = "up"
-                            left_counter += 1
-                        
-                        # Right arm rep counting
-                        if right_angle > 140:
-                            right_stage = "down"
-                        if right_angle < 50 and right_stage == "down":
-                            right_stage = "up"
-                            right_counter += 1
-                        
-                        # Check form using existing function
-                        form_check = check_bicep_form(left_shoulder, left_elbow, left_hip, left_wrist)
-                        if form_check.get('issues'):
-                            form_issues.extend(form_check['issues'])
-                            
-                    elif exercise_type == 'SITUPS':
-                        # Get relevant landmarks
-                        left_hip = [
-                            landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].x,
-                            landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].y
-                        ]
-                        left_shoulder = [
-                            landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                            landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y
-                        ]
-                        left_knee = [
-                            landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value].x,
-                            landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value].y
-                        ]
-                        
-                        # Calculate torso angle
-                        angle = calculate_angle(left_shoulder, left_hip, left_knee)
-                        
-                        # Sit-up rep counting
-                        if angle > 90:
-                            stage = "down"
-                        if angle < 45 and stage == "down":
-                            stage = "up"
-                            counter += 1
-                            
-                    elif exercise_type == 'VERTICAL_JUMP':
-                        # Get ankle position for jump height
-                        left_ankle = landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-                        right_ankle = landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value]
-                        
-                        # Use average ankle height
-                        avg_ankle_y = (left_ankle.y + right_ankle.y) / 2
-                        
-                        # Set baseline on first frame
-                        if frame_count == 1:
-                            baseline_y = avg_ankle_y
-                        
-                        # Calculate jump height (negative because y increases downward)
-                        if baseline_y is not None:
-                            jump_height = max(0, (baseline_y - avg_ankle_y) * 200)  # Convert to cm approximation
-                            current_jump_height = max(current_jump_height, jump_height)
-                            
-                            if jump_height > max_height_cm:
-                                max_height_cm = jump_height
-                            
-                            # Count jumps (simple threshold detection)
-                            if jump_height > 15:  # Minimum jump threshold
-                                jump_count = 1  # For single jump analysis
+                # Hash once for both the analyzer and the recorder; the
+                # analysis timing covers only the analyzer, as in replays
+                digest = frame_hash(frame)
+                analysis_start = time.perf_counter()
+                analyzer.process(pose_results.pose_landmarks, digest=digest)
+                analysis_seconds = time.perf_counter() - analysis_start
                 
-                else:
-                    low_confidence_frames += 1
+                if recorder:
+                    recorder.record(pose_results.pose_landmarks, digest,
+                                    inference_seconds, analysis_seconds)
         
         cap.release()
         
-        # Check for potential cheating based on detection quality
-        if frame_count > 0:
-            detection_ratio = (frame_count - low_confidence_frames) / frame_count
-            if detection_ratio < 0.5:  # Less than 50% good detections
-                cheat_detected = True
-                form_issues.append("Poor video quality or obstructed view detected")
+        results.update(analyzer.results())
         
-        # Prepare results based on exercise type
-        if exercise_type == 'BICEP_CURLS':
-            total_reps = left_counter + right_counter
-            form_score = max(60, 100 - len(set(form_issues)) * 10) if not cheat_detected else 40
-            
-            results.update({
-                'success': True,
-                'total_reps': total_reps,
-                'left_reps': left_counter,
-                'right_reps': right_counter,
-                'form_score': form_score,
-                'consistency_score': 85 if not cheat_detected else 50,
-                'cheat_detected': cheat_detected,
-                'form_issues': list(set(form_issues)),
-                'frames_processed': frame_count,
-                'detection_quality': detection_ratio if frame_count > 0 else 0
-            })
-            
-        elif exercise_type == 'SITUPS':
-            form_score = max(60, 90 - len(set(form_issues)) * 10) if not cheat_detected else 40
-            
-            results.update({
-                'success': True,
-                'total_reps': counter,
-                'form_score': form_score,
-                'consistency_score': 85 if not cheat_detected else 50,
-                'cheat_detected': cheat_detected,
-                'form_issues': list(set(form_issues)),
-                'frames_processed': frame_count,
-                'detection_quality': detection_ratio if frame_count > 0 else 0
-            })
-            
-        elif exercise_type == 'VERTICAL_JUMP':
-            form_score = 90 if not cheat_detected else 40
-            
-            results.update({
-                'success': True,
-                'max_height_cm': round(max_height_cm, 2),
-                'jump_count': jump_count,
-                'form_score': form_score,
-                'consistency_score': 85 if not cheat_detected else 50,
-                'cheat_detected': cheat_detected,
-                'frames_processed': frame_count,
-                'detection_quality': detection_ratio if frame_count > 0 else 0
-            })
+        if recorder:
+            # A recording is a side output; failing to write it must not
+            # fail the analysis
+            try:
+                results['recording_path'] = recorder.save(
+                    recording_path(record_dir, video_path, exercise_type), results
+                )
+            except Exception as e:
+                print(f"Could not save recording: {e}", file=sys.stderr)
+                results['recording_error'] = str(e)
+        
+        if age is not None and gender:
+            add_benchmark(results, age, gender)
             
     except Exception as e:
         results['error'] = f"Analysis error: {str(e)}"
@@ -265,7 +322,7 @@ def main():
     if len(sys.argv) < 4:
         error_result = {
             'success': False,
-            'error': 'Invalid arguments. Usage: python api_wrapper.py EXERCISE_TYPE FILE video_path'
+            'error': 'Invalid arguments. Usage: python api_wrapper.py EXERCISE_TYPE FILE video_path [AGE GENDER]'
         }
         print(json.dumps(error_result))
         return
@@ -273,9 +330,20 @@ def main():
     exercise_type = sys.argv[1]
     analysis_mode = sys.argv[2]
     video_path = sys.argv[3]
+    gender = sys.argv[5] if len(sys.argv) > 5 else None
+    try:
+        age = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    except ValueError:
+        error_result = {
+            'success': False,
+            'error': f'Invalid age: {sys.argv[4]}'
+        }
+        print(json.dumps(error_result))
+        return
     
     if analysis_mode == 'FILE':
-        result = run_video_analysis(exercise_type, video_path)
+        result = run_video_analysis(exercise_type, video_path, age, gender,
+                                    record_dir=os.environ.get('ANALYSIS_RECORD_DIR'))
         print(json.dumps(result))
     else:
         error_result = {
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Batch analysis of many videos to a JSONL results file.
+
+Usage:
+    python batch_analyze.py INPUT OUTPUT.jsonl [--exercise-type TYPE] [--workers N] [--timeout SECONDS]
+
+INPUT is either a directory of videos or a CSV/JSONL manifest with
+``path`` and ``exercise_type`` columns, plus optional ``age`` and
+``gender`` columns for benchmark percentiles. Entries already present in the
+output file are skipped, so an interrupted run can simply be restarted.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from api_wrapper import run_video_analysis
+
+EXERCISE_TYPES = ('BICEP_CURLS', 'SITUPS', 'VERTICAL_JUMP')
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v')
+
+
+def entry_key(video_path, exercise_type):
+    """Key used to match manifest entries against completed results."""
+    return f"{exercise_type}:{os.path.abspath(video_path)}"
+
+
+def load_directory(directory, exercise_type=None):
+    """
+    Collect video entries from a directory tree.
+
+    Videos take the name of the nearest parent folder that is a known
+    exercise type (e.g. ``SITUPS/``), falling back to ``exercise_type``.
+    """
+    entries = []
+    for root, _, files in os.walk(directory):
+        folder_type = None
+        relative = os.path.relpath(root, directory)
+        for part in reversed(relative.split(os.sep)):
+            if part.upper() in EXERCISE_TYPES:
+                folder_type = part.upper()
+                break
+        for filename in sorted(files):
+            if not filename.lower().endswith(VIDEO_EXTENSIONS):
+                continue
+            video_type = folder_type or exercise_type
+            if video_type is None:
+                print(f"Skipping {filename}: unknown exercise type", file=sys.stderr)
+                continue
+            entries.append({'path': os.path.join(root, filename), 'exercise_type': video_type})
+    return entries
+
+
+def load_manifest(manifest_path, exercise_type=None):
+    """
+    Read a CSV or JSONL manifest of ``path``/``exercise_type`` entries.
+
+    Relative paths are resolved against the manifest's directory.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, newline='') as f:
+        if manifest_path.lower().endswith('.csv'):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    entries = []
+    for row in rows:
+        path = row.get('path') or row.get('video_path')
+        video_type = (row.get('exercise_type') or exercise_type or '').upper()
+        if not path or video_type not in EXERCISE_TYPES:
+            print(f"Skipping invalid manifest entry: {row}", file=sys.stderr)
+            continue
+        entry = {'path': os.path.join(base_dir, path), 'exercise_type': video_type}
+        if row.get('age') and row.get('gender'):
+            try:
+                entry['age'] = int(row['age'])
+            except (TypeError, ValueError):
+                print(f"Skipping manifest entry with invalid age: {row}", file=sys.stderr)
+                continue
+            entry['gender'] = str(row['gender']).lower()
+        entries.append(entry)
+    return entries
+
+
+def load_completed(output_path, retry_failed=False):
+    """
+    Return the keys of entries already written to the output file.
+
+    A partially written last line from a crash is ignored so that entry
+    is analyzed again.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if retry_failed and not record.get('success'):
+                continue
+            completed.add(entry_key(record['video_path'], record['exercise_type']))
+    return completed
+
+
+def analyze_entry(entry):
+    """Worker: analyze one video and time it."""
+    start = time.time()
+    result = run_video_analysis(entry['exercise_type'], os.path.abspath(entry['path']),
+                                entry.get('age'), entry.get('gender'))
+    result['analysis_seconds'] = round(time.time() - start, 3)
+    return result
+
+
+def failed_record(entry, error):
+    """Result record for an entry whose worker crashed or timed out."""
+    return {
+        'exercise_type': entry['exercise_type'],
+        'analysis_mode': 'FILE',
+        'timestamp': time.time(),
+        'video_path': os.path.abspath(entry['path']),
+        'success': False,
+        'error': error,
+    }
+
+
+def _terminate(executor):
+    # ProcessPoolExecutor cannot cancel running tasks, so stop its workers
+    # directly before shutting down (needed for hung or crashed videos).
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _run_pool(pending, write, workers, timeout, max_tasks_per_child, analyze=analyze_entry):
+    """
+    Analyze entries from ``pending`` until it is empty or the pool breaks.
+
+    Entries that exceed ``timeout`` get a failed record; the pool is then
+    restarted and the other in-flight entries go back to ``pending``.
+
+    Returns:
+        list: Entries that were in flight when a worker process died.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=max_tasks_per_child)
+    in_flight = {}
+    try:
+        while pending or in_flight:
+            while pending and len(in_flight) < workers:
+                entry = pending.popleft()
+                in_flight[executor.submit(analyze, entry)] = (entry, time.time())
+
+            done, _ = wait(in_flight, timeout=1, return_when=FIRST_COMPLETED)
+            crashed = False
+            for future in done:
+                entry, _ = in_flight.pop(future)
+                try:
+                    write(future.result())
+                except BrokenProcessPool:
+                    in_flight[future] = (entry, None)
+                    crashed = True
+                except Exception as e:
+                    write(failed_record(entry, f"Analysis error: {str(e)}"))
+            if crashed:
+                return [entry for entry, _ in in_flight.values()]
+
+            now = time.time()
+            overdue = [f for f, (_, started) in in_flight.items() if now - started > timeout]
+            if overdue:
+                for future in overdue:
+                    entry, _ = in_flight.pop(future)
+                    write(failed_record(entry, f"Analysis timed out after {timeout}s"))
+                pending.extendleft(entry for entry, _ in in_flight.values())
+                in_flight.clear()
+                _terminate(executor)
+                executor = ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=max_tasks_per_child)
+        return []
+    finally:
+        _terminate(executor)
+
+
+def run_batch(entries, output_path, workers=1, timeout=600, max_tasks_per_child=20,
+              analyze=analyze_entry):
+    """
+    Analyze entries with a pool of workers and stream results to JSONL.
+
+    A worker that dies (segfault, OOM kill) breaks the pool; the entries
+    that were in flight are then re-run one at a time so the video that
+    kills its worker gets a failed record and the batch carries on.
+    ``analyze`` is the picklable worker function (``analyze_entry``).
+
+    Returns:
+        dict: Throughput summary of this run.
+    """
+    stats = {'videos': 0, 'failed': 0, 'frames': 0}
+    start = time.time()
+
+    # Make sure a truncated last line from a crash does not swallow the next record
+    needs_newline = False
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        with open(output_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+
+    with open(output_path, 'a') as out:
+        if needs_newline:
+            out.write('\n')
+
+        def write(result):
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+
+            stats['videos'] += 1
+            stats['frames'] += result.get('frames_processed', 0)
+            if not result.get('success'):
+                stats['failed'] += 1
+            print(f"[{stats['videos']}/{len(entries)}] {result['video_path']}: "
+                  f"{'ok' if result.get('success') else result.get('error')}", file=sys.stderr)
+
+        pending = deque(entries)
+        while pending:
+            suspects = _run_pool(pending, write, workers, timeout, max_tasks_per_child, analyze)
+            for entry in suspects:
+                if _run_pool(deque([entry]), write, 1, timeout, max_tasks_per_child, analyze):
+                    write(failed_record(entry, "Worker process crashed"))
+
+    elapsed = time.time() - start
+    stats['elapsed_seconds'] = round(elapsed, 2)
+    stats['videos_per_minute'] = round(stats['videos'] / elapsed * 60, 2) if elapsed > 0 else 0
+    stats['frames_per_second'] = round(stats['frames'] / elapsed, 2) if elapsed > 0 else 0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a directory or manifest of videos to JSONL.")
+    parser.add_argument('input', help="Directory of videos or CSV/JSONL manifest")
+    parser.add_argument('output', help="JSONL file to append results to")
+    parser.add_argument('--exercise-type', choices=EXERCISE_TYPES,
+                        help="Exercise type for videos without one")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Number of parallel worker processes")
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="Re-analyze entries whose previous result failed")
+    parser.add_argument('--timeout', type=float, default=600,
+                        help="Seconds before a single video is abandoned as failed")
+    parser.add_argument('--max-tasks-per-child', type=int, default=20,
+                        help="Videos each worker process analyzes before it is replaced")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.input):
+        entries = load_directory(args.input, args.exercise_type)
+    else:
+        entries = load_manifest(args.input, args.exercise_type)
+
+    completed = load_completed(args.output, args.retry_failed)
+    pending = [e for e in entries if entry_key(e['path'], e['exercise_type']) not in completed]
+    print(f"{len(entries)} videos found, {len(entries) - len(pending)} already completed, "
+          f"{len(pending)} to analyze with {args.workers} workers", file=sys.stderr)
+
+    stats = run_batch(pending, args.output, max(1, args.workers), args.timeout,
+                      max(1, args.max_tasks_per_child))
+
+    print("\n" + "=" * 50)
+    print("BATCH SUMMARY")
+    print("=" * 50)
+    print(f"Videos analyzed: {stats['videos']} ({stats['failed']} failed)")
+    print(f"Frames processed: {stats['frames']}")
+    print(f"Elapsed: {stats['elapsed_seconds']:.1f}s")
+    print(f"Throughput: {stats['videos_per_minute']:.1f} videos/min, "
+          f"{stats['frames_per_second']:.1f} frames/sec")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
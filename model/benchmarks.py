@@ -0,0 +1,208 @@
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+
+# Age bands used for benchmark comparison (athletes are 8-50 years old)
+AGE_BAND_EDGES = np.array([12, 15, 18, 25, 35])
+AGE_BANDS = ['U12', '12-14', '15-17', '18-24', '25-34', '35+']
+
+GENDERS = ('male', 'female', 'other')
+
+# Result field compared against the benchmarks for each exercise
+RESULT_METRICS = {
+    'BICEP_CURLS': 'total_reps',
+    'SITUPS': 'total_reps',
+    'VERTICAL_JUMP': 'max_height_cm',
+}
+
+# Timed tests where a lower result is better
+LOWER_IS_BETTER = {'SHUTTLE_RUN'}
+
+
+def age_band(ages):
+    """
+    Map ages to age band labels.
+
+    Args:
+        ages (int or array-like): Athlete age(s) in years.
+
+    Returns:
+        str or np.ndarray: Age band label(s).
+    """
+    indices = np.searchsorted(AGE_BAND_EDGES, ages, side='right')
+    labels = np.array(AGE_BANDS)[indices]
+    return labels if np.ndim(ages) else str(labels)
+
+
+def _groups(exercise_types, bands, genders):
+    # Yield (exercise type, band, gender, indices) for each distinct group
+    exercise_values, exercise_ids = np.unique(exercise_types, return_inverse=True)
+    band_values, band_ids = np.unique(bands, return_inverse=True)
+    gender_values, gender_ids = np.unique(genders, return_inverse=True)
+    group_ids = (exercise_ids * len(band_values) + band_ids) * len(gender_values) + gender_ids
+
+    order = np.argsort(group_ids, kind='stable')
+    splits = np.flatnonzero(np.diff(group_ids[order])) + 1
+    for indices in np.split(order, splits):
+        if indices.size == 0:
+            continue
+        first = indices[0]
+        yield (str(exercise_values[exercise_ids[first]]), str(band_values[band_ids[first]]),
+               str(gender_values[gender_ids[first]]), indices)
+
+
+class PercentileEngine:
+    """
+    Age/gender benchmark percentiles backed by sorted NumPy arrays.
+
+    Reference scores are kept sorted per (exercise type, age band, gender)
+    so a percentile is a binary search. New verified scores are buffered
+    and merged into the sorted arrays on the next query.
+    """
+
+    def __init__(self):
+        self._scores = {}
+        self._pending = {}
+
+    @staticmethod
+    def _key(exercise_type, band, gender):
+        return (exercise_type.upper(), band, gender.lower())
+
+    def add(self, exercise_type, age, gender, values):
+        """
+        Add verified scores for one athlete group.
+
+        Args:
+            exercise_type (str): Exercise type, e.g. 'SITUPS'.
+            age (int): Age used to pick the age band.
+            gender (str): 'male', 'female' or 'other'.
+            values (float or array-like): Scores to add.
+        """
+        key = self._key(exercise_type, age_band(age), gender)
+        self._pending.setdefault(key, []).append(np.atleast_1d(np.asarray(values, dtype=np.float64)))
+
+    def add_many(self, exercise_types, ages, genders, values):
+        """Add verified scores for many athletes at once."""
+        values = np.asarray(values, dtype=np.float64)
+        for exercise_type, band, gender, indices in _groups(exercise_types, age_band(np.asarray(ages)), genders):
+            key = self._key(exercise_type, band, gender)
+            self._pending.setdefault(key, []).append(values[indices])
+
+    def _sorted_scores(self, key):
+        # Merge buffered scores into the sorted array for this group
+        pending = self._pending.pop(key, None)
+        scores = self._scores.get(key)
+        if pending:
+            new_scores = np.sort(np.concatenate(pending))
+            if scores is None:
+                scores = new_scores
+            else:
+                scores = np.insert(scores, np.searchsorted(scores, new_scores), new_scores)
+            self._scores[key] = scores
+        return scores
+
+    def percentile(self, exercise_type, age, gender, value):
+        """
+        Percentile of a single result, or None without reference data.
+        """
+        result = self.percentiles([exercise_type], [age], [gender], [value])[0]
+        return None if np.isnan(result) else float(result)
+
+    def percentiles(self, exercise_types, ages, genders, values):
+        """
+        Percentiles for many results at once.
+
+        The percentile is the share of reference scores that are not
+        better than the result, matching ``Submission.calculatePercentile``.
+
+        Returns:
+            np.ndarray: Percentiles in [0, 100], NaN where a group has no
+            reference data.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        output = np.full(values.shape, np.nan)
+
+        for exercise_type, band, gender, indices in _groups(exercise_types, age_band(np.asarray(ages)), genders):
+            scores = self._sorted_scores(self._key(exercise_type, band, gender))
+            if scores is None or scores.size == 0:
+                continue
+            if exercise_type.upper() in LOWER_IS_BETTER:
+                not_better = scores.size - np.searchsorted(scores, values[indices], side='left')
+            else:
+                not_better = np.searchsorted(scores, values[indices], side='right')
+            output[indices] = 100.0 * not_better / scores.size
+        return output
+
+    def group_size(self, exercise_type, age, gender):
+        """Number of reference scores for an athlete's group."""
+        scores = self._sorted_scores(self._key(exercise_type, age_band(age), gender))
+        return 0 if scores is None else int(scores.size)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load reference scores from a CSV or JSONL file.
+
+        Each row needs ``exercise_type``, ``age``, ``gender`` and ``value``.
+        """
+        with open(path, newline='') as f:
+            if path.lower().endswith('.csv'):
+                rows = list(csv.DictReader(f))
+            else:
+                rows = [json.loads(line) for line in f if line.strip()]
+
+        engine = cls()
+        if rows:
+            engine.add_many(
+                [row['exercise_type'].upper() for row in rows],
+                [int(row['age']) for row in rows],
+                [row['gender'].lower() for row in rows],
+                [float(row['value']) for row in rows],
+            )
+        return engine
+
+
+_default_engine = None
+
+
+def get_default_engine():
+    """
+    Engine loaded from the file named by ``BENCHMARKS_FILE``, or None.
+    """
+    global _default_engine
+    path = os.environ.get('BENCHMARKS_FILE')
+    if _default_engine is None and path and os.path.exists(path):
+        _default_engine = PercentileEngine.from_file(path)
+    return _default_engine
+
+
+def add_benchmark(results, age, gender, engine=None):
+    """
+    Add percentile comparison fields to analysis results in place.
+
+    Args:
+        results (dict): Output of ``run_video_analysis``.
+        age (int): Athlete age in years.
+        gender (str): Athlete gender.
+        engine (PercentileEngine): Defaults to ``get_default_engine()``.
+    """
+    # A malformed BENCHMARKS_FILE or athlete field only drops the comparison
+    try:
+        engine = engine or get_default_engine()
+        metric = RESULT_METRICS.get(results.get('exercise_type'))
+        if engine is None or metric is None or metric not in results:
+            return results
+        percentile = engine.percentile(results['exercise_type'], age, gender, results[metric])
+        sample_size = engine.group_size(results['exercise_type'], age, gender)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"Could not compute benchmark: {e!r}", file=sys.stderr)
+        results['benchmark_error'] = str(e)
+        return results
+
+    results['age_band'] = age_band(age)
+    results['percentile'] = percentile
+    results['benchmark_sample_size'] = sample_size
+    return results
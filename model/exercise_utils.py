@@ -0,0 +1,62 @@
+import numpy as np
+
+def calculate_angle(a, b, c):
+    """
+    Calculates the angle between three given points in 2D space.
+    
+    Args:
+        a (list): [x, y] coordinates of the first point.
+        b (list): [x, y] coordinates of the mid (vertex) point.
+        c (list): [x, y] coordinates of the end point.
+    
+    Returns:
+        float: The calculated angle in degrees.
+    """
+    a = np.array(a)  # First point
+    b = np.array(b)  # Mid point (vertex)
+    c = np.array(c)  # End point
+    
+    radians = np.arctan2(c[1] - b[1], c[0] - b[0]) - np.arctan2(a[1] - b[1], a[0] - b[0])
+    angle = np.abs(radians * 180.0 / np.pi)
+    
+    if angle > 180.0:
+        angle = 360 - angle
+        
+    return angle
+
+def check_bicep_form(shoulder, elbow, hip, wrist):
+    """
+    Check bicep curl form based on multiple criteria.
+    
+    Args:
+        shoulder, elbow, hip, wrist: [x, y] coordinates of body landmarks
+    
+    Returns:
+        dict: Contains form status and specific feedback
+    """
+    form_issues = []
+    
+    # Check if elbow is stable (not moving too far from body)
+    shoulder_elbow_dist = np.linalg.norm(np.array(shoulder) - np.array(elbow))
+    if shoulder_elbow_dist > 0.25:  # Adjust based on typical body proportions
+        form_issues.append("Keep elbow close to body")
+    
+    # Check upper arm angle (should stay relatively vertical)
+    upper_arm_angle = calculate_angle(hip, shoulder, elbow)
+    if upper_arm_angle < 70 or upper_arm_angle > 110:
+        form_issues.append("Keep upper arm stable")
+    
+    # Check if elbow is behind or too far forward from shoulder
+    if elbow[0] < shoulder[0] - 0.1:  # Elbow too far back
+        form_issues.append("Don't swing elbow back")
+    elif elbow[0] > shoulder[0] + 0.1:  # Elbow too far forward
+        form_issues.append("Don't swing elbow forward")
+    
+    status = "GOOD" if len(form_issues) == 0 else "BAD"
+    feedback = form_issues[0] if form_issues else "Good form!"
+    
+    return {
+        'status': status,
+        'feedback': feedback,
+        'issues': form_issues
+    }
@@ -0,0 +1,140 @@
+"""
+Binary frame transport between the backend and the live analysis engine.
+
+Every request is a fixed 10-byte little-endian header followed by a payload:
+
+    type (u8) | encoding (u8) | width (u16) | height (u16) | length (u32)
+
+``START`` carries a small JSON payload (exercise type, fps), ``FRAME``
+carries a JPEG or raw BGR image and ``END`` has no payload. Every reply is
+a u32 length followed by a UTF-8 JSON document.
+"""
+import json
+import struct
+
+import cv2
+import numpy as np
+
+HEADER = struct.Struct('<BBHHI')
+REPLY_HEADER = struct.Struct('<I')
+
+# Message types
+MSG_START = 1
+MSG_FRAME = 2
+MSG_END = 3
+
+# Frame encodings
+ENCODING_NONE = 0
+ENCODING_JPEG = 1
+ENCODING_BGR = 2
+
+MAX_PAYLOAD_BYTES = 64 * 1024 * 1024
+
+
+def send_message(sock, msg_type, payload=b'', encoding=ENCODING_NONE, width=0, height=0):
+    """
+    Send one request without concatenating header and payload.
+
+    ``payload`` may be bytes or any contiguous buffer such as a NumPy frame.
+    """
+    payload = memoryview(payload).cast('B')
+    header = HEADER.pack(msg_type, encoding, width, height, payload.nbytes)
+    _send_buffers(sock, [header, payload] if payload.nbytes else [header])
+
+
+def send_reply(sock, reply):
+    """Send a JSON reply with its length prefix."""
+    body = json.dumps(reply).encode('utf-8')
+    _send_buffers(sock, [REPLY_HEADER.pack(len(body)), body])
+
+
+def read_reply(sock):
+    """Read one JSON reply sent with ``send_reply``."""
+    header = _recv_exact(sock, bytearray(REPLY_HEADER.size))
+    (length,) = REPLY_HEADER.unpack(header)
+    return json.loads(bytes(_recv_exact(sock, bytearray(length))))
+
+
+def _send_buffers(sock, buffers):
+    # Scatter/gather send that copes with partial writes
+    views = [memoryview(buffer).cast('B') for buffer in buffers]
+    while views:
+        sent = sock.sendmsg(views)
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+        if views:
+            views[0] = views[0][sent:]
+
+
+def _recv_exact(sock, buffer):
+    view = memoryview(buffer)
+    received = 0
+    while received < len(view):
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError("Connection closed mid-message")
+        received += count
+    return buffer
+
+
+class FrameReader:
+    """
+    Reads requests from a socket into a reusable receive buffer.
+
+    Payloads and raw frames returned by ``read_message``/``decode_frame``
+    are views into that buffer and are only valid until the next read.
+    """
+
+    def __init__(self, sock, initial_size=1024 * 1024):
+        self.sock = sock
+        self._header = bytearray(HEADER.size)
+        self._buffer = bytearray(initial_size)
+
+    def read_message(self):
+        """
+        Read the next request.
+
+        Returns:
+            tuple or None: ``(msg_type, encoding, width, height, payload)``
+            with ``payload`` a memoryview, or None when the peer closed
+            the connection between messages.
+        """
+        view = memoryview(self._header)
+        count = self.sock.recv_into(view)
+        if count == 0:
+            return None
+        if count < HEADER.size:
+            _recv_exact(self.sock, view[count:])
+        msg_type, encoding, width, height, length = HEADER.unpack(self._header)
+
+        if length > MAX_PAYLOAD_BYTES:
+            raise ValueError(f"Payload too large: {length} bytes")
+        if length > len(self._buffer):
+            self._buffer = bytearray(max(length, 2 * len(self._buffer)))
+        payload = memoryview(self._buffer)[:length]
+        _recv_exact(self.sock, payload)
+        return msg_type, encoding, width, height, payload
+
+    @staticmethod
+    def decode_frame(encoding, width, height, payload):
+        """
+        Turn a frame payload into a BGR image.
+
+        Raw BGR frames are returned as a zero-copy view of the payload.
+        JPEG frames are decoded by ``cv2.imdecode``, which allocates a new
+        image per frame; send raw BGR when that matters more than bandwidth.
+        """
+        data = np.frombuffer(payload, dtype=np.uint8)
+        if data.size == 0:
+            raise ValueError("Empty frame payload")
+        if encoding == ENCODING_BGR:
+            if data.size != width * height * 3:
+                raise ValueError(f"Raw frame size {data.size} does not match {width}x{height}")
+            return data.reshape(height, width, 3)
+        if encoding == ENCODING_JPEG:
+            frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+            if frame is None:
+                raise ValueError("Could not decode JPEG frame")
+            return frame
+        raise ValueError(f"Unsupported frame encoding: {encoding}")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Live analysis engine serving the binary frame transport over a Unix socket.
+
+Usage:
+    python live_engine.py [--socket /tmp/sports-live.sock] [--record-dir DIR] [--idle-timeout 60]
+
+Each connection is one live session: a START message with the exercise
+type and capture fps, any number of FRAME messages answered with the live status, and an
+END message answered with the final results. A connection that sends
+nothing for ``--idle-timeout`` seconds is closed.
+"""
+import argparse
+import json
+import os
+import socketserver
+import time
+
+import cv2
+import mediapipe as mp
+
+from api_wrapper import ExerciseAnalyzer
+from benchmarks import GENDERS, add_benchmark
+from quality_monitor import frame_hash
+from session_recorder import SessionRecorder, recording_path
+from frame_transport import (
+    FrameReader, send_reply, MSG_START, MSG_FRAME, MSG_END
+)
+
+DEFAULT_SOCKET_PATH = '/tmp/sports-live.sock'
+DEFAULT_IDLE_TIMEOUT = 60.0
+
+mp_pose = mp.solutions.pose
+
+
+class LiveSessionHandler(socketserver.BaseRequestHandler):
+    """Runs one live analysis session for the lifetime of a connection."""
+
+    def setup(self):
+        self.request.settimeout(self.server.idle_timeout)
+        self.reader = FrameReader(self.request)
+        self.analyzer = None
+        self.pose = None
+        self.rgb_buffer = None
+        self.athlete = {}
+        self.recorder = None
+
+    def handle(self):
+        try:
+            while True:
+                message = self.reader.read_message()
+                if message is None:
+                    break
+                msg_type, encoding, width, height, payload = message
+
+                if msg_type == MSG_START:
+                    send_reply(self.request, self.start_session(json.loads(bytes(payload))))
+                elif msg_type == MSG_FRAME:
+                    send_reply(self.request, self.process_frame(encoding, width, height, payload))
+                elif msg_type == MSG_END:
+                    send_reply(self.request, self.end_session())
+                    break
+                else:
+                    send_reply(self.request, {'success': False, 'error': f'Unknown message type: {msg_type}'})
+        except TimeoutError:
+            print(f"Live session idle for {self.server.idle_timeout}s, closing")
+        except (ConnectionError, ValueError) as e:
+            print(f"Live session closed: {e}")
+
+    def finish(self):
+        if self.pose is not None:
+            self.pose.close()
+
+    def start_session(self, options):
+        fps = options.get('fps') or 30
+        if isinstance(fps, bool) or not isinstance(fps, (int, float)) or fps <= 0:
+            return {'success': False, 'error': f'Invalid fps: {fps}'}
+        self.athlete = {key: options[key] for key in ('age', 'gender') if options.get(key)}
+        if 'age' in self.athlete:
+            try:
+                self.athlete['age'] = int(self.athlete['age'])
+            except (TypeError, ValueError):
+                return {'success': False, 'error': f"Invalid age: {self.athlete['age']}"}
+        if 'gender' in self.athlete:
+            gender = self.athlete['gender']
+            if not isinstance(gender, str) or gender.lower() not in GENDERS:
+                return {'success': False, 'error': f'Invalid gender: {gender}'}
+            self.athlete['gender'] = gender.lower()
+        try:
+            self.analyzer = ExerciseAnalyzer(options.get('exercise_type'), fps=fps)
+        except ValueError as e:
+            return {'success': False, 'error': str(e)}
+        self.pose = mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        if self.server.record_dir:
+            self.recorder = SessionRecorder(self.analyzer.exercise_type, fps=fps, source='live')
+        return {'success': True}
+
+    def process_frame(self, encoding, width, height, payload):
+        if self.analyzer is None:
+            return {'success': False, 'error': 'Session not started'}
+        try:
+            frame = FrameReader.decode_frame(encoding, width, height, payload)
+        except ValueError as e:
+            return {'success': False, 'error': str(e)}
+
+        # A bad frame or a MediaPipe failure fails this frame, not the session
+        try:
+            # Convert into a reusable RGB buffer instead of allocating per frame
+            if self.rgb_buffer is None or self.rgb_buffer.shape != frame.shape:
+                self.rgb_buffer = frame.copy()
+            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb_buffer)
+            image.flags.writeable = False
+            inference_start = time.perf_counter()
+            pose_results = self.pose.process(image)
+            inference_seconds = time.perf_counter() - inference_start
+            image.flags.writeable = True
+        except Exception as e:
+            return {'success': False, 'error': f'Frame processing error: {e}'}
+
+        digest = frame_hash(frame)
+        analysis_start = time.perf_counter()
+        self.analyzer.process(pose_results.pose_landmarks, digest=digest)
+        analysis_seconds = time.perf_counter() - analysis_start
+        if self.recorder:
+            self.recorder.record(pose_results.pose_landmarks, digest,
+                                 inference_seconds, analysis_seconds)
+
+        status = self.analyzer.live_status()
+        status['success'] = True
+        status['pose_detected'] = pose_results.pose_landmarks is not None
+        status['landmarks'] = [
+            {'x': lm.x, 'y': lm.y, 'z': lm.z, 'visibility': lm.visibility}
+            for lm in pose_results.pose_landmarks.landmark
+        ] if pose_results.pose_landmarks else []
+        return status
+
+    def end_session(self):
+        if self.analyzer is None:
+            return {'success': False, 'error': 'Session not started'}
+        results = {'exercise_type': self.analyzer.exercise_type, 'analysis_mode': 'LIVE'}
+        results.update(self.analyzer.results())
+        if len(self.athlete) == 2:
+            add_benchmark(results, self.athlete['age'], self.athlete['gender'])
+        if self.recorder:
+            try:
+                results['recording_path'] = self.recorder.save(
+                    recording_path(self.server.record_dir, 'live', self.analyzer.exercise_type), results
+                )
+            except Exception as e:
+                print(f"Could not save recording: {e}")
+                results['recording_error'] = str(e)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live analysis engine over a Unix socket.")
+    parser.add_argument('--socket', default=os.environ.get('LIVE_ENGINE_SOCKET', DEFAULT_SOCKET_PATH),
+                        help="Unix socket path to listen on")
+    parser.add_argument('--record-dir', default=os.environ.get('ANALYSIS_RECORD_DIR'),
+                        help="Record every session here for replay_session.py")
+    parser.add_argument('--idle-timeout', type=float,
+                        default=float(os.environ.get('LIVE_ENGINE_IDLE_TIMEOUT', DEFAULT_IDLE_TIMEOUT)),
+                        help="Close sessions that send nothing for this many seconds")
+    args = parser.parse_args()
+
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+
+    with socketserver.ThreadingUnixStreamServer(args.socket, LiveSessionHandler) as server:
+        server.daemon_threads = True
+        server.record_dir = args.record_dir
+        server.idle_timeout = args.idle_timeout
+        print(f"Live engine listening on {args.socket}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
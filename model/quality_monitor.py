@@ -0,0 +1,300 @@
+import zlib
+from collections import deque
+
+import numpy as np
+
+# MediaPipe Pose landmark indices grouped by body region
+ARM_LANDMARKS = [11, 12, 13, 14, 15, 16]    # shoulders, elbows, wrists
+LEG_LANDMARKS = [23, 24, 25, 26, 27, 28]    # hips, knees, ankles
+TORSO_LANDMARKS = [11, 12, 23, 24, 25, 26]  # shoulders, hips, knees
+
+EXERCISE_REGIONS = {
+    'BICEP_CURLS': ARM_LANDMARKS,
+    'SITUPS': TORSO_LANDMARKS,
+    'VERTICAL_JUMP': LEG_LANDMARKS,
+}
+
+NUM_LANDMARKS = 33
+
+
+def landmark_visibility(pose_landmarks, out=None):
+    """
+    Copy the visibility of every pose landmark into a NumPy array.
+
+    Args:
+        pose_landmarks: MediaPipe ``pose_landmarks`` result (or None).
+        out (np.ndarray): Optional reusable float32 buffer of length 33.
+
+    Returns:
+        np.ndarray or None: Visibility scores, or None if no pose was found.
+    """
+    if pose_landmarks is None:
+        return None
+    if out is None:
+        out = np.empty(NUM_LANDMARKS, dtype=np.float32)
+    for i, landmark in enumerate(pose_landmarks.landmark):
+        out[i] = landmark.visibility
+    return out
+
+
+def frame_hash(frame, grid=16):
+    """
+    Cheap perceptual hash of a frame used for frozen/looped frame detection.
+
+    Samples a ``grid`` x ``grid`` set of pixels, converts them to grayscale
+    and quantizes to 16 levels so encoder noise does not change the hash.
+    """
+    height, width = frame.shape[:2]
+    sample = frame[::max(1, height // grid), ::max(1, width // grid)]
+    if sample.ndim == 3:
+        sample = sample.mean(axis=2)
+    quantized = (sample.astype(np.uint8) >> 4)
+    return zlib.crc32(np.ascontiguousarray(quantized).tobytes())
+
+
+class QualityMonitor:
+    """
+    Rolling-window video quality and cheat detector.
+
+    Every call to ``update`` costs O(1): windowed ratios are kept as running
+    sums over fixed-size ring buffers, so a bad start can recover and a
+    good start cannot hide later occlusion. Shared by live and file modes.
+
+    Frames before the first detected pose (athlete still walking into
+    view) do not count towards the windows. Frozen frames are reported but
+    not treated as cheating on their own, since a static tripod shot
+    produces identical frames too.
+    """
+
+    REASONS = ('low_visibility', 'region_occluded', 'frozen_frame', 'looped_frame')
+    WINDOWED_REASONS = ('low_visibility', 'region_occluded')
+
+    def __init__(self, exercise_type=None, fps=30, window_seconds=2.0,
+                 min_confidence=0.5, max_low_ratio=0.3, min_frames=10,
+                 frozen_seconds=3.0, loop_seconds=10.0, min_segment_seconds=1.0):
+        self.fps = fps if fps and fps > 0 else 30
+        self.window = max(1, int(round(window_seconds * self.fps)))
+        self.min_confidence = min_confidence
+        self.max_low_ratio = max_low_ratio
+        self.min_frames = min_frames
+        self.frozen_frames = max(2, int(round(frozen_seconds * self.fps)))
+        self.loop_frames = max(1, int(round(loop_seconds * self.fps)))
+        self.loop_min_frames = max(2, int(round(0.5 * self.fps)))
+        self.min_segment_frames = int(round(min_segment_seconds * self.fps))
+        self.region = np.array(EXERCISE_REGIONS.get(exercise_type, []), dtype=np.intp)
+
+        # Ring buffers of per-frame flags with running sums
+        self._low = np.zeros(self.window, dtype=np.uint8)
+        self._region_low = np.zeros(self.window, dtype=np.uint8)
+        self._low_sum = 0
+        self._region_low_sum = 0
+        self._region_vis = np.zeros(self.window, dtype=np.float32)
+        self._region_vis_sum = 0.0
+
+        # Frame hash state. Hashes are tracked as runs of identical
+        # consecutive frames so duplicated frames do not break loop matching.
+        self._last_hash = None
+        self._same_hash_run = 0
+        self._run_index = 0
+        self._hash_order = deque()
+        self._hash_seen = {}
+        self._loop_match = None
+        self._loop_run = 0
+        self._loop_start = None
+
+        self.frame_count = 0
+        self.low_confidence_frames = 0
+        self._tracked_frames = 0
+        self._active = dict.fromkeys(self.REASONS)
+        self._low_frames = dict.fromkeys(self.REASONS, 0)
+        self._last_low = dict.fromkeys(self.REASONS, 0)
+        self._last_end = dict.fromkeys(self.REASONS, 0)
+        self._segments = []
+
+    def update(self, visibility, frame=None, digest=None):
+        """
+        Feed one frame into the detector.
+
+        Args:
+            visibility (np.ndarray or None): Per-landmark visibility scores
+                (see ``landmark_visibility``); None when no pose was detected.
+            frame (np.ndarray): Optional raw frame for frozen/loop detection.
+            digest (int): Precomputed ``frame_hash`` used instead of ``frame``.
+
+        Returns:
+            dict: Current windowed status for this frame.
+        """
+        self.frame_count += 1
+
+        if visibility is None:
+            low = 1
+            region_vis = 0.0
+        else:
+            low = int(visibility.mean() < self.min_confidence)
+            region_vis = float(visibility[self.region].mean()) if self.region.size else float(visibility.mean())
+        region_low = int(region_vis < self.min_confidence)
+        self.low_confidence_frames += low
+
+        # Windows start at the first detected pose
+        if visibility is not None or self._tracked_frames > 0:
+            index = self._tracked_frames % self.window
+            self._tracked_frames += 1
+            self._low_sum += low - int(self._low[index])
+            self._low[index] = low
+            self._region_low_sum += region_low - int(self._region_low[index])
+            self._region_low[index] = region_low
+            self._region_vis_sum += region_vis - float(self._region_vis[index])
+            self._region_vis[index] = region_vis
+
+        filled = max(1, min(self._tracked_frames, self.window))
+        low_ratio = self._low_sum / filled
+        region_low_ratio = self._region_low_sum / filled
+        warmed_up = self._tracked_frames > self.min_frames
+
+        frozen = looped = False
+        if digest is None and frame is not None:
+            digest = frame_hash(frame)
+        if digest is not None:
+            frozen, looped = self._update_hash(digest)
+
+        flags = {
+            'low_visibility': warmed_up and low_ratio > self.max_low_ratio,
+            'region_occluded': warmed_up and self.region.size > 0 and region_low_ratio > self.max_low_ratio,
+            'frozen_frame': frozen,
+            'looped_frame': looped,
+        }
+        flag_lows = {
+            'low_visibility': low,
+            'region_occluded': region_low,
+            'frozen_frame': 1,
+            'looped_frame': 1,
+        }
+        for reason, active in flags.items():
+            self._track_segment(reason, active, flag_lows[reason])
+
+        return {
+            'is_suspect': flags['low_visibility'] or flags['region_occluded'] or flags['looped_frame'],
+            'reasons': [reason for reason, active in flags.items() if active],
+            'low_ratio': low_ratio,
+            'region_low_ratio': region_low_ratio,
+            'region_visibility': self._region_vis_sum / filled,
+        }
+
+    def _update_hash(self, current):
+        if current == self._last_hash:
+            self._same_hash_run += 1
+            frozen = self._same_hash_run >= self.frozen_frames
+            return frozen, self._loop_run >= self.loop_min_frames
+
+        self._same_hash_run = 1
+        self._last_hash = current
+        self._run_index += 1
+
+        # A sequence of hash changes that replays an earlier sequence in
+        # order means the video is looping; a single repeated hash is not
+        # enough. Matching runs rather than frames keeps clips with
+        # duplicated frames (e.g. 15 fps content in a 30 fps file) matching,
+        # and requiring a period of 3+ runs ignores flicker between two
+        # hashes in a static shot.
+        previous = self._hash_seen.get(current)
+        if (previous is not None and self.frame_count - previous[1] > self.loop_min_frames
+                and self._run_index - previous[0] > 2):
+            if self._loop_match is not None and previous[0] == self._loop_match + 1:
+                self._loop_run += 1
+            else:
+                self._loop_run = 1
+                self._loop_start = self.frame_count
+            self._loop_match = previous[0]
+        else:
+            self._loop_run = 0
+            self._loop_match = None
+        looped = self._loop_run >= self.loop_min_frames
+
+        self._hash_seen[current] = (self._run_index, self.frame_count)
+        self._hash_order.append((current, self._run_index, self.frame_count))
+        while self._hash_order and self._hash_order[0][2] <= self.frame_count - self.loop_frames:
+            old_hash, run_index, _ = self._hash_order.popleft()
+            if self._hash_seen.get(old_hash, (None,))[0] == run_index:
+                del self._hash_seen[old_hash]
+        return False, looped
+
+    def _window_lows(self, flags, after):
+        # Frame numbers of the low frames in the window after frame ``after``
+        filled = min(self._tracked_frames, self.window)
+        shift = self._tracked_frames % self.window if self._tracked_frames >= self.window else 0
+        frames = np.arange(self.frame_count - filled + 1, self.frame_count + 1)
+        chronological = np.roll(flags[:filled], -shift)
+        return frames[(chronological > 0) & (frames > after)]
+
+    def _track_segment(self, reason, active, low):
+        if active and self._active[reason] is None:
+            # The condition triggers some frames into the bad stretch;
+            # segments are backdated to the first frame of the stretch.
+            if reason in self.WINDOWED_REASONS:
+                flags = self._low if reason == 'low_visibility' else self._region_low
+                lows = self._window_lows(flags, self._last_end[reason])
+                if lows.size == 0:
+                    lows = np.array([self.frame_count])
+                start, last, count = int(lows[0]), int(lows[-1]), int(lows.size)
+            elif reason == 'frozen_frame':
+                start = self.frame_count - self._same_hash_run + 1
+                last, count = self.frame_count, self._same_hash_run
+            else:
+                start, last = self._loop_start, self.frame_count
+                count = self.frame_count - self._loop_start + 1
+            self._active[reason] = start
+            self._last_low[reason] = last
+            self._low_frames[reason] = count
+        elif active:
+            if low:
+                self._last_low[reason] = self.frame_count
+                self._low_frames[reason] += 1
+        elif self._active[reason] is not None:
+            # Segments end at their last low frame, not when the window
+            # has drained
+            self._segments.append(self._segment(reason, self._active[reason], self._last_low[reason]))
+            self._last_end[reason] = self._last_low[reason]
+            self._active[reason] = None
+
+    def _segment(self, reason, start, end):
+        return {
+            'reason': reason,
+            'start_frame': start,
+            'end_frame': end,
+            'start_time': round((start - 1) / self.fps, 3),
+            'end_time': round(end / self.fps, 3),
+            'low_frames': self._low_frames[reason],
+        }
+
+    def suspect_segments(self):
+        """Return closed and still-open suspect segments with time ranges."""
+        segments = list(self._segments)
+        for reason, start in self._active.items():
+            if start is not None:
+                segments.append(self._segment(reason, start, self._last_low[reason]))
+        return sorted(segments, key=lambda segment: segment['start_frame'])
+
+    def summary(self):
+        """
+        Summarize the whole session.
+
+        Returns:
+            dict: Overall detection quality, suspect segments and whether
+            the video loops or has a sustained low-visibility segment (at
+            least ``min_segment_frames`` low frames).
+        """
+        segments = self.suspect_segments()
+        cheat_detected = any(
+            segment['reason'] == 'looped_frame' or
+            (segment['reason'] in self.WINDOWED_REASONS and
+             segment['low_frames'] >= self.min_segment_frames)
+            for segment in segments
+        )
+        detection_quality = 0
+        if self.frame_count > 0:
+            detection_quality = (self.frame_count - self.low_confidence_frames) / self.frame_count
+        return {
+            'detection_quality': detection_quality,
+            'cheat_detected': cheat_detected,
+            'suspect_segments': segments,
+        }
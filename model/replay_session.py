@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded analysis session through the scoring layer, optionally
+under a profiler.
+
+Usage:
+    python replay_session.py RECORDING.npz [--profile cprofile|sample] [--output PREFIX]
+
+Sessions are recorded by ``run_video_analysis`` (``ANALYSIS_RECORD_DIR``)
+or ``live_engine.py --record-dir``. The replay re-drives ``ExerciseAnalyzer``
+from the recorded landmarks, so no video or MediaPipe inference is needed.
+``--profile sample`` writes folded stacks (``PREFIX.folded``) for
+flamegraph.pl or speedscope; ``--profile cprofile`` writes ``PREFIX.prof``.
+"""
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from api_wrapper import ExerciseAnalyzer
+from session_recorder import RecordedPose, load_recording
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread at a fixed interval.
+
+    Stacks are aggregated in the folded format used by flame graph tools:
+    ``outer;inner;leaf count`` per line.
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def write_folded(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def build_frames(recording):
+    """Rebuild per-frame analyzer inputs ahead of time so they are not profiled."""
+    poses = [
+        RecordedPose(values) if has_pose else None
+        for values, has_pose in zip(recording['landmarks'], recording['has_pose'])
+    ]
+    digests = [None if digest < 0 else int(digest) for digest in recording['digests']]
+    return poses, digests
+
+
+def replay(metadata, poses, digests):
+    """
+    Run the recorded frames through a fresh ``ExerciseAnalyzer``.
+
+    Returns:
+        tuple: (final results, per-frame analysis seconds)
+    """
+    analyzer = ExerciseAnalyzer(metadata['exercise_type'], fps=metadata['fps'])
+    timings = np.empty(len(poses))
+    for i, (pose, digest) in enumerate(zip(poses, digests)):
+        start = time.perf_counter()
+        analyzer.process(pose, digest=digest)
+        timings[i] = time.perf_counter() - start
+    return analyzer.results(), timings
+
+
+def timing_summary(seconds):
+    if len(seconds) == 0:
+        return {'mean_ms': 0, 'p95_ms': 0, 'total_s': 0}
+    return {
+        'mean_ms': round(float(np.mean(seconds)) * 1000, 4),
+        'p95_ms': round(float(np.percentile(seconds, 95)) * 1000, 4),
+        'total_s': round(float(np.sum(seconds)), 4),
+    }
+
+
+def _normalize(value):
+    # Lists built from sets (e.g. form_issues) have no stable order
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return sorted(value)
+    return value
+
+
+def compare_results(recorded, replayed):
+    """Fields whose replayed value differs from the recorded session."""
+    if not recorded:
+        return {}
+    return {
+        key: {'recorded': recorded.get(key), 'replayed': value}
+        for key, value in replayed.items()
+        if _normalize(recorded.get(key)) != _normalize(value)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded analysis session.")
+    parser.add_argument('recording', help="Recording (.npz) written by SessionRecorder")
+    parser.add_argument('--profile', choices=('none', 'cprofile', 'sample'), default='none',
+                        help="Profiler to run the replay under")
+    parser.add_argument('--output', help="Output prefix for profiler files (default: recording name)")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="Replay the session N times to collect more samples")
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help="Sampling interval in milliseconds for --profile sample")
+    args = parser.parse_args()
+
+    recording = load_recording(args.recording)
+    metadata = recording['metadata']
+    poses, digests = build_frames(recording)
+    output = args.output or os.path.splitext(args.recording)[0]
+
+    profiler = None
+    if args.profile == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif args.profile == 'sample':
+        profiler = SamplingProfiler(args.interval / 1000)
+        profiler.start()
+
+    all_timings = []
+    for _ in range(max(1, args.repeat)):
+        results, timings = replay(metadata, poses, digests)
+        all_timings.append(timings)
+
+    if args.profile == 'cprofile':
+        profiler.disable()
+    elif args.profile == 'sample':
+        profiler.stop()
+
+    report = {
+        'recording': args.recording,
+        'exercise_type': metadata['exercise_type'],
+        'frames': len(poses),
+        'recorded_inference': timing_summary(recording['inference_seconds']),
+        'recorded_analysis': timing_summary(recording['analysis_seconds']),
+        'replayed_analysis': timing_summary(np.concatenate(all_timings)),
+        'result_differences': compare_results(metadata.get('results'), results),
+    }
+
+    if args.profile == 'cprofile':
+        report['profile_path'] = f"{output}.prof"
+        profiler.dump_stats(report['profile_path'])
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(20)
+    elif args.profile == 'sample':
+        report['profile_path'] = profiler.write_folded(f"{output}.folded")
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
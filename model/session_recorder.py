@@ -0,0 +1,115 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from quality_monitor import NUM_LANDMARKS
+
+
+class RecordedLandmark:
+    """Stand-in for a MediaPipe landmark rebuilt from a recording."""
+
+    __slots__ = ('x', 'y', 'z', 'visibility')
+
+    def __init__(self, x, y, z, visibility):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+
+class RecordedPose:
+    """Stand-in for MediaPipe ``pose_landmarks`` rebuilt from a recording."""
+
+    __slots__ = ('landmark',)
+
+    def __init__(self, values):
+        self.landmark = [RecordedLandmark(*map(float, row)) for row in values]
+
+
+class SessionRecorder:
+    """
+    Records the per-frame pose outputs and timings of an analysis session.
+
+    A recording holds everything ``ExerciseAnalyzer`` consumes (landmarks
+    and frame hashes), so a session can be replayed and profiled later
+    without the original video or rerunning MediaPipe.
+    """
+
+    def __init__(self, exercise_type, fps=30, source=None):
+        self.metadata = {
+            'exercise_type': exercise_type,
+            'fps': fps,
+            'source': source,
+            'recorded_at': time.time(),
+        }
+        self._landmarks = []
+        self._has_pose = []
+        self._digests = []
+        self._inference_seconds = []
+        self._analysis_seconds = []
+
+    def record(self, pose_landmarks, digest=None, inference_seconds=0.0, analysis_seconds=0.0):
+        """
+        Record one frame.
+
+        Args:
+            pose_landmarks: MediaPipe ``pose_landmarks`` result (or None).
+            digest (int): The frame's ``frame_hash``, as passed to the analyzer.
+            inference_seconds (float): Time spent in ``pose.process``.
+            analysis_seconds (float): Time spent in ``ExerciseAnalyzer.process``.
+        """
+        values = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+        if pose_landmarks is not None:
+            for i, landmark in enumerate(pose_landmarks.landmark):
+                values[i] = (landmark.x, landmark.y, landmark.z, landmark.visibility)
+        self._landmarks.append(values)
+        self._has_pose.append(pose_landmarks is not None)
+        self._digests.append(-1 if digest is None else digest)
+        self._inference_seconds.append(inference_seconds)
+        self._analysis_seconds.append(analysis_seconds)
+
+    def save(self, path, results=None):
+        """
+        Write the recording to a compressed ``.npz`` file.
+
+        Args:
+            path (str): Output file path.
+            results (dict): Optional final results of the recorded session,
+                kept so replays can be checked against them.
+        """
+        metadata = dict(self.metadata, results=results)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(
+            path,
+            landmarks=np.array(self._landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 4),
+            has_pose=np.array(self._has_pose, dtype=bool),
+            digests=np.array(self._digests, dtype=np.int64),
+            inference_seconds=np.array(self._inference_seconds, dtype=np.float64),
+            analysis_seconds=np.array(self._analysis_seconds, dtype=np.float64),
+            metadata=np.array(json.dumps(metadata)),
+        )
+        return path
+
+
+def load_recording(path):
+    """
+    Load a recording written by ``SessionRecorder.save``.
+
+    Returns:
+        dict: Metadata plus per-frame arrays (``landmarks``, ``has_pose``,
+        ``digests``, ``inference_seconds``, ``analysis_seconds``).
+    """
+    with np.load(path) as data:
+        recording = {key: data[key] for key in data.files if key != 'metadata'}
+        recording['metadata'] = json.loads(str(data['metadata']))
+    return recording
+
+
+def recording_path(directory, source, exercise_type):
+    """Build a unique recording file name for a session."""
+    name = os.path.splitext(os.path.basename(str(source)))[0] or 'session'
+    return os.path.join(directory, f"{exercise_type}-{name}-{int(time.time() * 1000)}.npz")
@@ -0,0 +1,124 @@
+"""
+Unit tests for batch analysis: manifests, resume and worker failures
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from batch_analyze import entry_key, load_completed, load_manifest, run_batch
+
+
+def fake_analyze(entry):
+    # Stand-in for analyze_entry; the file name picks the behaviour
+    name = os.path.basename(entry['path'])
+    if name.startswith('crash'):
+        os._exit(1)
+    if name.startswith('hang'):
+        time.sleep(60)
+    return {
+        'exercise_type': entry['exercise_type'],
+        'video_path': os.path.abspath(entry['path']),
+        'success': True,
+        'frames_processed': 10,
+    }
+
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_load_manifest_csv(tmp_path):
+    manifest = tmp_path / 'manifest.csv'
+    manifest.write_text(
+        "path,exercise_type,age,gender\n"
+        "videos/a.mp4,situps,16,Female\n"
+        "/data/b.mp4,,,\n"
+        "videos/c.mp4,PUSHUPS,,\n"
+        "videos/d.mp4,SITUPS,sixteen,male\n"
+        ",SITUPS,,\n"
+    )
+    entries = load_manifest(str(manifest), exercise_type='VERTICAL_JUMP')
+
+    assert entries == [
+        {'path': str(tmp_path / 'videos' / 'a.mp4'), 'exercise_type': 'SITUPS',
+         'age': 16, 'gender': 'female'},
+        {'path': '/data/b.mp4', 'exercise_type': 'VERTICAL_JUMP'},
+    ]
+
+
+def test_load_manifest_jsonl(tmp_path):
+    manifest = tmp_path / 'manifest.jsonl'
+    manifest.write_text(
+        json.dumps({'video_path': 'a.mp4', 'exercise_type': 'BICEP_CURLS'}) + "\n\n"
+        + json.dumps({'path': 'b.mp4'}) + "\n"
+    )
+    entries = load_manifest(str(manifest))
+
+    assert entries == [{'path': str(tmp_path / 'a.mp4'), 'exercise_type': 'BICEP_CURLS'}]
+
+
+def test_load_completed(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    output.write_text(
+        json.dumps({'video_path': '/v/a.mp4', 'exercise_type': 'SITUPS', 'success': True}) + "\n"
+        + json.dumps({'video_path': '/v/b.mp4', 'exercise_type': 'SITUPS', 'success': False}) + "\n"
+        + '{"video_path": "/v/c.mp4", "exer'
+    )
+
+    assert load_completed(str(output)) == {'SITUPS:/v/a.mp4', 'SITUPS:/v/b.mp4'}
+    assert load_completed(str(output), retry_failed=True) == {'SITUPS:/v/a.mp4'}
+    assert load_completed(str(tmp_path / 'missing.jsonl')) == set()
+
+
+def test_entry_key_matches_relative_paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    assert entry_key('videos/a.mp4', 'SITUPS') == entry_key(str(tmp_path / 'videos' / 'a.mp4'), 'SITUPS')
+    assert entry_key('videos/a.mp4', 'SITUPS') != entry_key('videos/a.mp4', 'BICEP_CURLS')
+
+
+def test_run_batch_resumes_after_truncated_output(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    output.write_text('{"video_path": "/v/partial.mp4", "exer')
+    entries = [{'path': str(tmp_path / f'{name}.mp4'), 'exercise_type': 'SITUPS'} for name in 'abc']
+
+    stats = run_batch(entries[:2], str(output), workers=2, analyze=fake_analyze)
+    assert stats['videos'] == 2 and stats['failed'] == 0 and stats['frames'] == 20
+
+    # The records written after the truncated line are complete and count as done
+    completed = load_completed(str(output))
+    pending = [e for e in entries if entry_key(e['path'], e['exercise_type']) not in completed]
+    assert pending == entries[2:]
+
+
+def test_run_batch_survives_crashed_worker(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    entries = [{'path': str(tmp_path / name), 'exercise_type': 'SITUPS'}
+               for name in ('a.mp4', 'crash.mp4', 'b.mp4', 'c.mp4')]
+
+    stats = run_batch(entries, str(output), workers=2, analyze=fake_analyze)
+
+    records = {os.path.basename(r['video_path']): r for r in read_records(output)}
+    assert set(records) == {'a.mp4', 'crash.mp4', 'b.mp4', 'c.mp4'}
+    assert records['crash.mp4']['error'] == "Worker process crashed"
+    assert all(records[name]['success'] for name in ('a.mp4', 'b.mp4', 'c.mp4'))
+    assert stats['failed'] == 1
+
+
+def test_run_batch_times_out_hung_worker(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    entries = [{'path': str(tmp_path / name), 'exercise_type': 'SITUPS'}
+               for name in ('hang.mp4', 'a.mp4', 'b.mp4')]
+
+    start = time.time()
+    run_batch(entries, str(output), workers=2, timeout=1, analyze=fake_analyze)
+    assert time.time() - start < 30
+
+    records = {os.path.basename(r['video_path']): r for r in read_records(output)}
+    assert set(records) == {'hang.mp4', 'a.mp4', 'b.mp4'}
+    assert records['hang.mp4']['error'] == "Analysis timed out after 1s"
+    assert records['a.mp4']['success'] and records['b.mp4']['success']
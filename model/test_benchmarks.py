@@ -0,0 +1,113 @@
+"""
+Unit tests for the age/gender benchmark percentile engine
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from benchmarks import PercentileEngine, add_benchmark, age_band
+
+
+def test_age_bands():
+    assert age_band(11) == 'U12'
+    assert age_band(12) == '12-14'
+    assert age_band(35) == '35+'
+    assert list(age_band([8, 16, 20, 30])) == ['U12', '15-17', '18-24', '25-34']
+
+
+def test_bulk_grouping_matches_single_adds():
+    rng = np.random.default_rng(0)
+    exercise_types = rng.choice(['SITUPS', 'VERTICAL_JUMP'], 500)
+    ages = rng.integers(8, 50, 500)
+    genders = rng.choice(['male', 'female'], 500)
+    values = rng.integers(0, 60, 500).astype(float)
+
+    bulk = PercentileEngine()
+    bulk.add_many(exercise_types, ages, genders, values)
+    single = PercentileEngine()
+    for row in zip(exercise_types, ages, genders, values):
+        single.add(*row)
+
+    queries = (exercise_types[:50], ages[:50], genders[:50], values[:50] + 0.5)
+    expected = [single.percentile(*row) for row in zip(*queries)]
+    np.testing.assert_allclose(bulk.percentiles(*queries), expected)
+    assert bulk.group_size('SITUPS', 20, 'male') == single.group_size('SITUPS', 20, 'male')
+
+
+def test_percentile_counts_results_not_better():
+    engine = PercentileEngine()
+    engine.add('SITUPS', 20, 'male', [10, 20, 20, 30])
+
+    assert engine.percentile('SITUPS', 20, 'male', 5) == 0.0
+    assert engine.percentile('SITUPS', 20, 'male', 20) == 75.0
+    assert engine.percentile('SITUPS', 20, 'male', 40) == 100.0
+
+
+def test_lower_is_better():
+    engine = PercentileEngine()
+    engine.add('SHUTTLE_RUN', 20, 'female', [9.0, 10.0, 10.0, 12.0])
+
+    assert engine.percentile('SHUTTLE_RUN', 20, 'female', 8.5) == 100.0
+    assert engine.percentile('SHUTTLE_RUN', 20, 'female', 10.0) == 75.0
+    assert engine.percentile('SHUTTLE_RUN', 20, 'female', 13.0) == 0.0
+
+
+def test_incremental_adds_are_merged():
+    engine = PercentileEngine()
+    engine.add('SITUPS', 16, 'female', [30, 10])
+    assert engine.percentile('SITUPS', 16, 'female', 20) == 50.0
+
+    # Added after the group was sorted, including values between existing ones
+    engine.add('SITUPS', 16, 'female', [20, 5])
+    engine.add_many(['SITUPS'], [17], ['female'], [25])
+    assert engine.group_size('SITUPS', 16, 'female') == 5
+    assert engine.percentile('SITUPS', 16, 'female', 20) == 60.0
+    np.testing.assert_array_equal(engine._sorted_scores(('SITUPS', '15-17', 'female')),
+                                  [5, 10, 20, 25, 30])
+
+
+def test_empty_groups():
+    engine = PercentileEngine()
+    engine.add('SITUPS', 20, 'male', [10, 20])
+
+    assert engine.percentile('SITUPS', 20, 'female', 15) is None
+    assert engine.group_size('SITUPS', 40, 'male') == 0
+    output = engine.percentiles(['SITUPS', 'SITUPS'], [20, 40], ['male', 'male'], [15, 15])
+    assert output[0] == 50.0
+    assert np.isnan(output[1])
+
+    engine.add_many([], [], [], [])
+    assert PercentileEngine().percentiles([], [], [], []).size == 0
+
+
+def test_add_benchmark():
+    engine = PercentileEngine()
+    engine.add('SITUPS', 20, 'male', [10, 20, 30, 40])
+    results = add_benchmark({'exercise_type': 'SITUPS', 'total_reps': 25}, 20, 'male', engine)
+
+    assert results['age_band'] == '18-24'
+    assert results['percentile'] == 50.0
+    assert results['benchmark_sample_size'] == 4
+
+
+def test_malformed_benchmarks_file_does_not_fail(tmp_path, monkeypatch):
+    path = tmp_path / 'benchmarks.csv'
+    path.write_text("exercise_type,age,gender,value\nSITUPS,twenty,male,10\n")
+    monkeypatch.setenv('BENCHMARKS_FILE', str(path))
+    monkeypatch.setattr('benchmarks._default_engine', None)
+
+    results = add_benchmark({'exercise_type': 'SITUPS', 'total_reps': 25}, 20, 'male')
+    assert 'benchmark_error' in results
+    assert 'percentile' not in results
+
+
+def test_bad_gender_does_not_fail():
+    engine = PercentileEngine()
+    engine.add('SITUPS', 20, 'male', [10, 20])
+
+    results = add_benchmark({'exercise_type': 'SITUPS', 'total_reps': 15}, 20, ['male'], engine)
+    assert 'benchmark_error' in results
+    assert 'percentile' not in results
@@ -0,0 +1,118 @@
+"""
+Unit tests for the binary frame transport wire format
+"""
+import os
+import socket
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from frame_transport import (
+    HEADER, MAX_PAYLOAD_BYTES, ENCODING_BGR, ENCODING_NONE, MSG_END, MSG_FRAME, MSG_START,
+    FrameReader, read_reply, send_message, send_reply
+)
+
+
+class ChunkedSocket:
+    """Socket stand-in that returns at most ``chunk`` bytes per read."""
+
+    def __init__(self, data, chunk):
+        self.data = bytes(data)
+        self.chunk = chunk
+
+    def recv_into(self, view):
+        count = min(len(view), self.chunk, len(self.data))
+        view[:count] = self.data[:count]
+        self.data = self.data[count:]
+        return count
+
+
+def test_round_trip_over_socketpair():
+    left, right = socket.socketpair()
+    with left, right:
+        frame = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+        send_message(left, MSG_START, b'{"exercise_type": "SITUPS"}')
+        send_message(left, MSG_FRAME, frame, ENCODING_BGR, 6, 4)
+        send_message(left, MSG_END)
+        reader = FrameReader(right)
+
+        assert bytes(reader.read_message()[4]) == b'{"exercise_type": "SITUPS"}'
+
+        msg_type, encoding, width, height, payload = reader.read_message()
+        assert (msg_type, encoding, width, height) == (MSG_FRAME, ENCODING_BGR, 6, 4)
+        decoded = FrameReader.decode_frame(encoding, width, height, payload)
+        np.testing.assert_array_equal(decoded, frame)
+        # Raw frames are a view of the receive buffer, not a copy
+        assert np.shares_memory(decoded, np.frombuffer(reader._buffer, dtype=np.uint8))
+
+        assert reader.read_message()[:4] == (MSG_END, ENCODING_NONE, 0, 0)
+        left.close()
+        assert reader.read_message() is None
+
+
+def test_header_and_payload_split_across_reads():
+    payload = bytes(range(50))
+    data = HEADER.pack(MSG_FRAME, ENCODING_BGR, 1, 1, len(payload)) + payload
+    reader = FrameReader(ChunkedSocket(data * 2, chunk=3))
+
+    for _ in range(2):
+        msg_type, encoding, width, height, received = reader.read_message()
+        assert (msg_type, encoding, width, height) == (MSG_FRAME, ENCODING_BGR, 1, 1)
+        assert bytes(received) == payload
+    assert reader.read_message() is None
+
+
+def test_connection_closed_mid_message():
+    data = HEADER.pack(MSG_FRAME, ENCODING_BGR, 1, 1, 10) + bytes(4)
+    with pytest.raises(ConnectionError):
+        FrameReader(ChunkedSocket(data, chunk=64)).read_message()
+
+
+def test_buffer_grows_for_large_payloads():
+    left, right = socket.socketpair()
+    with left, right:
+        reader = FrameReader(right, initial_size=16)
+        large = os.urandom(4 * 1024 * 1024)
+        # Bigger than the socket buffer, so the sender must loop on partial writes
+        sender = threading.Thread(target=lambda: (send_message(left, MSG_FRAME, large),
+                                                  send_message(left, MSG_FRAME, b'small')))
+        sender.start()
+
+        assert bytes(reader.read_message()[4]) == large
+        assert len(reader._buffer) >= len(large)
+        assert bytes(reader.read_message()[4]) == b'small'
+        sender.join()
+
+
+def test_payload_limit():
+    data = HEADER.pack(MSG_FRAME, ENCODING_BGR, 0, 0, MAX_PAYLOAD_BYTES + 1)
+    reader = FrameReader(ChunkedSocket(data, chunk=64), initial_size=16)
+
+    with pytest.raises(ValueError, match="too large"):
+        reader.read_message()
+    assert len(reader._buffer) == 16
+
+
+def test_decode_frame_rejects_bad_frames():
+    with pytest.raises(ValueError, match="does not match"):
+        FrameReader.decode_frame(ENCODING_BGR, 2, 2, bytes(11))
+    with pytest.raises(ValueError):
+        FrameReader.decode_frame(ENCODING_BGR, 0, 0, b'')
+    with pytest.raises(ValueError):
+        FrameReader.decode_frame(ENCODING_BGR, 0, 4, bytes(12))
+    with pytest.raises(ValueError, match="Unsupported"):
+        FrameReader.decode_frame(99, 1, 1, bytes(3))
+
+
+def test_reply_framing():
+    left, right = socket.socketpair()
+    with left, right:
+        send_reply(left, {'success': True, 'stage': 'up'})
+        send_reply(left, {'error': 'Ungültig'})
+
+        assert read_reply(right) == {'success': True, 'stage': 'up'}
+        assert read_reply(right) == {'error': 'Ungültig'}
@@ -0,0 +1,148 @@
+"""
+Unit tests for the rolling-window quality monitor
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from quality_monitor import QualityMonitor, frame_hash
+
+FPS = 30
+GOOD = np.full(33, 0.9, dtype=np.float32)
+
+
+def run(monitor, visibilities, digests=None):
+    for i, visibility in enumerate(visibilities):
+        monitor.update(visibility, digest=None if digests is None else digests[i])
+    return monitor.summary()
+
+
+def test_short_dropout_is_not_cheating():
+    # 60 s session with a 0.7 s pose dropout
+    frames = [GOOD] * (60 * FPS)
+    frames[900:921] = [None] * 21
+    summary = run(QualityMonitor('SITUPS', fps=FPS), frames)
+
+    assert not summary['cheat_detected']
+    assert summary['detection_quality'] > 0.98
+    for segment in summary['suspect_segments']:
+        assert segment['start_frame'] > 900
+        assert segment['low_frames'] <= 21
+
+
+def test_late_start_is_not_cheating():
+    frames = [None] * 45 + [GOOD] * (10 * FPS)
+    summary = run(QualityMonitor('SITUPS', fps=FPS), frames)
+
+    assert not summary['cheat_detected']
+    assert summary['suspect_segments'] == []
+
+
+def test_window_recovers_after_bad_stretch():
+    monitor = QualityMonitor('SITUPS', fps=FPS)
+    for _ in range(30):
+        monitor.update(GOOD)
+    for _ in range(3 * FPS):
+        status = monitor.update(None)
+    assert status['is_suspect']
+
+    for _ in range(3 * FPS):
+        status = monitor.update(GOOD)
+    assert not status['is_suspect']
+
+
+def test_sustained_occlusion_is_cheating_with_segment_times():
+    frames = [GOOD] * (5 * FPS) + [None] * (3 * FPS) + [GOOD] * (5 * FPS)
+    summary = run(QualityMonitor('SITUPS', fps=FPS), frames)
+
+    assert summary['cheat_detected']
+    segment = next(s for s in summary['suspect_segments'] if s['reason'] == 'low_visibility')
+    # Triggered once the window ratio crosses 30 %, but covers the dropout
+    assert segment['start_frame'] == 5 * FPS + 1
+    assert segment['end_frame'] == 8 * FPS
+    assert (segment['start_time'], segment['end_time']) == (5.0, 8.0)
+    assert segment['low_frames'] == 3 * FPS
+
+
+def test_repeated_dropouts_do_not_overlap():
+    frames = ([GOOD] * (2 * FPS) + [None] * FPS + [GOOD] * 10 + [None] * FPS + [GOOD] * (3 * FPS))
+    summary = run(QualityMonitor('SITUPS', fps=FPS), frames)
+
+    segments = [s for s in summary['suspect_segments'] if s['reason'] == 'low_visibility']
+    for first, second in zip(segments, segments[1:]):
+        assert second['start_frame'] > first['end_frame']
+    assert segments[0]['start_frame'] == 2 * FPS + 1
+    assert segments[-1]['end_frame'] == 4 * FPS + 10
+    assert sum(s['low_frames'] for s in segments) == 2 * FPS
+
+
+def test_region_occlusion():
+    arms_hidden = GOOD.copy()
+    arms_hidden[11:17] = 0.1
+    frames = [GOOD] * (2 * FPS) + [arms_hidden] * (3 * FPS)
+
+    curls = run(QualityMonitor('BICEP_CURLS', fps=FPS), frames)
+    reasons = {segment['reason'] for segment in curls['suspect_segments']}
+    assert reasons == {'region_occluded'}
+    assert curls['cheat_detected']
+
+    # Jumps only look at the legs
+    jumps = run(QualityMonitor('VERTICAL_JUMP', fps=FPS), frames)
+    assert jumps['suspect_segments'] == []
+
+
+def test_frozen_frames_are_reported_but_not_cheating():
+    frames = [GOOD] * (6 * FPS)
+    digests = [7] * 105 + list(range(100, 100 + 6 * FPS - 105))
+    summary = run(QualityMonitor('SITUPS', fps=FPS), frames, digests)
+
+    assert not summary['cheat_detected']
+    segment = summary['suspect_segments'][0]
+    assert segment['reason'] == 'frozen_frame'
+    assert segment['start_frame'] == 1
+    assert segment['end_frame'] == 105
+    assert segment['low_frames'] == 105
+
+
+def test_looped_video_is_cheating():
+    clip = list(range(1000, 1000 + 2 * FPS))
+    digests = list(range(5 * FPS)) + clip + clip
+    summary = run(QualityMonitor('SITUPS', fps=FPS), [GOOD] * len(digests), digests)
+
+    assert summary['cheat_detected']
+    segment = summary['suspect_segments'][0]
+    assert segment['reason'] == 'looped_frame'
+    assert segment['start_frame'] == 5 * FPS + 2 * FPS + 1
+    assert segment['end_frame'] == len(digests)
+
+
+def test_looped_video_with_duplicated_frames_is_cheating():
+    # 15 fps content in a 30 fps file: every frame appears twice
+    clip = [digest for digest in range(1000, 1060) for _ in range(2)]
+    digests = list(range(5 * FPS)) + clip * 3
+    summary = run(QualityMonitor('SITUPS', fps=FPS), [GOOD] * len(digests), digests)
+
+    assert summary['cheat_detected']
+    segment = summary['suspect_segments'][0]
+    assert segment['reason'] == 'looped_frame'
+    assert segment['start_frame'] == 5 * FPS + len(clip) + 1
+    assert segment['end_frame'] == len(digests)
+
+
+def test_static_shot_flicker_is_not_a_loop():
+    digests = ([1] * 20 + [2] * 20) * 10
+    summary = run(QualityMonitor('SITUPS', fps=FPS), [GOOD] * len(digests), digests)
+
+    assert not summary['cheat_detected']
+
+
+def test_frame_hash_ignores_small_noise():
+    rng = np.random.default_rng(0)
+    frame = (rng.integers(0, 16, (120, 160, 3)) * 16).astype(np.uint8)
+    noisy = frame + rng.integers(0, 4, frame.shape).astype(np.uint8)
+
+    assert frame_hash(frame) == frame_hash(noisy)
+    assert frame_hash(frame) != frame_hash(255 - frame)
@@ -0,0 +1,89 @@
+"""
+Unit tests for session recording and replay
+"""
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from api_wrapper import ExerciseAnalyzer
+from quality_monitor import NUM_LANDMARKS
+from replay_session import build_frames, compare_results, replay
+from session_recorder import RecordedPose, SessionRecorder, load_recording
+
+FPS = 30
+
+
+def situp_pose(angle):
+    # Shoulder rotates around the hip; knee fixed, so the torso angle is ``angle``
+    values = np.full((NUM_LANDMARKS, 4), 0.9, dtype=np.float32)
+    hip, knee = (0.5, 0.6), (0.7, 0.6)
+    radians = math.radians(angle)
+    values[:, :3] = (0.5, 0.5, 0.0)
+    values[11, :2] = values[12, :2] = (hip[0] + 0.3 * math.cos(radians), hip[1] - 0.3 * math.sin(radians))
+    values[23, :2] = values[24, :2] = hip
+    values[25, :2] = values[26, :2] = knee
+    return RecordedPose(values)
+
+
+def situp_session():
+    """Sit-ups with a pose dropout, a frozen stretch and unhashed frames."""
+    poses, digests = [], []
+    for frame in range(8 * FPS):
+        poses.append(situp_pose(100 + 70 * math.cos(2 * math.pi * frame / (2 * FPS))))
+        digests.append(frame)
+    poses[40:80] = [None] * 40
+    digests[120:215] = [7] * 95
+    digests[220:230] = [None] * 10
+    return poses, digests
+
+
+def test_record_and_replay_round_trip(tmp_path):
+    poses, digests = situp_session()
+    analyzer = ExerciseAnalyzer('SITUPS', fps=FPS)
+    recorder = SessionRecorder('SITUPS', fps=FPS, source='test')
+    for pose, digest in zip(poses, digests):
+        analyzer.process(pose, digest=digest)
+        recorder.record(pose, digest, 0.01, 0.001)
+    results = dict(analyzer.results(), exercise_type='SITUPS')
+    reasons = {segment['reason'] for segment in results['suspect_segments']}
+    assert {'low_visibility', 'frozen_frame'} <= reasons
+    assert results['total_reps'] == 3
+
+    path = recorder.save(str(tmp_path / 'nested' / 'session.npz'), results)
+    recording = load_recording(path)
+    assert recording['metadata']['fps'] == FPS
+    assert recording['landmarks'].shape == (len(poses), NUM_LANDMARKS, 4)
+    np.testing.assert_allclose(recording['inference_seconds'], 0.01)
+
+    replay_poses, replay_digests = build_frames(recording)
+    replayed, timings = replay(recording['metadata'], replay_poses, replay_digests)
+
+    assert compare_results(recording['metadata']['results'], replayed) == {}
+    assert len(timings) == len(poses)
+
+    # The recorded digests matter: without them the frozen stretch is lost
+    unhashed, _ = replay(recording['metadata'], replay_poses, [None] * len(poses))
+    assert 'suspect_segments' in compare_results(recording['metadata']['results'], unhashed)
+
+
+def test_missing_poses_and_digests_round_trip(tmp_path):
+    recorder = SessionRecorder('SITUPS', fps=FPS)
+    pose = situp_pose(120)
+    recorder.record(pose, 0)
+    recorder.record(None, None)
+    recorder.record(pose, 2 ** 32 - 1)
+    recording = load_recording(recorder.save(str(tmp_path / 'session.npz')))
+
+    np.testing.assert_array_equal(recording['digests'], [0, -1, 2 ** 32 - 1])
+    np.testing.assert_array_equal(recording['has_pose'], [True, False, True])
+    assert np.isnan(recording['landmarks'][1]).all()
+
+    poses, digests = build_frames(recording)
+    assert digests == [0, None, 2 ** 32 - 1]
+    assert poses[1] is None
+    assert [lm.x for lm in poses[0].landmark] == [lm.x for lm in pose.landmark]
+    assert recording['metadata']['results'] is None
@@ -3,71 +3,13 @@ import mediapipe as mp
 import numpy as np
 import time
 
+from exercise_utils import calculate_angle, check_bicep_form
+from quality_monitor import QualityMonitor, landmark_visibility
+
 # Initialize MediaPipe Pose solution
 mp_drawing = mp.solutions.drawing_utils
 mp_pose = mp.solutions.pose
 
-def calculate_angle(a, b, c):
-    """
-    Calculates the angle between three given points in 2D space.
-    
-    Args:
-        a (list): [x, y] coordinates of the first point.
-        b (list): [x, y] coordinates of the mid (vertex) point.
-        c (list): [x, y] coordinates of the end point.
-    
-    Returns:
-        float: The calculated angle in degrees.
-    """
-    a = np.array(a)  # First point
-    b = np.array(b)  # Mid point (vertex)
-    c = np.array(c)  # End point
-    
-    radians = np.arctan2(c[1] - b[1], c[0] - b[0]) - np.arctan2(a[1] - b[1], a[0] - b[0])
-    angle = np.abs(radians * 180.0 / np.pi)
-    
-    if angle > 180.0:
-        angle = 360 - angle
-        
-    return angle
-
-def check_bicep_form(shoulder, elbow, hip, wrist):
-    """
-    Check bicep curl form based on multiple criteria.
-    
-    Args:
-        shoulder, elbow, hip, wrist: [x, y] coordinates of body landmarks
-    
-    Returns:
-        dict: Contains form status and specific feedback
-    """
-    form_issues = []
-    
-    # Check if elbow is stable (not moving too far from body)
-    shoulder_elbow_dist = np.linalg.norm(np.array(shoulder) - np.array(elbow))
-    if shoulder_elbow_dist > 0.25:  # Adjust based on typical body proportions
-        form_issues.append("Keep elbow close to body")
-    
-    # Check upper arm angle (should stay relatively vertical)
-    upper_arm_angle = calculate_angle(hip, shoulder, elbow)
-    if upper_arm_angle < 70 or upper_arm_angle > 110:
-        form_issues.append("Keep upper arm stable")
-    
-    # Check if elbow is behind or too far forward from shoulder
-    if elbow[0] < shoulder[0] - 0.1:  # Elbow too far back
-        form_issues.append("Don't swing elbow back")
-    elif elbow[0] > shoulder[0] + 0.1:  # Elbow too far forward
-        form_issues.append("Don't swing elbow forward")
-    
-    status = "GOOD" if len(form_issues) == 0 else "BAD"
-    feedback = form_issues[0] if form_issues else "Good form!"
-    
-    return {
-        'status': status,
-        'feedback': feedback,
-        'issues': form_issues
-    }
-
 # --- Configuration and State Variables ---
 
 # Bicep Curl variables
@@ -164,6 +106,12 @@ with mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as
         print("Error: Could not open video source.")
         exit()
 
+    # Rolling-window cheat detection shared by live and file modes
+    source_fps = cap.get(cv2.CAP_PROP_FPS)
+    quality_monitor = QualityMonitor(EXERCISE_MODE, fps=source_fps if source_fps > 0 else 30,
+                                     min_confidence=MIN_CONFIDENCE)
+    visibility_buffer = np.empty(33, dtype=np.float32)
+
     while cap.isOpened():
         ret, frame = cap.read()
         
@@ -192,15 +140,11 @@ with mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as
             if elapsed_time < MIN_VIDEO_DURATION_SECONDS:
                 current_cheating = True
 
-        if results.pose_landmarks:
-            visibility_scores = [landmark.visibility for landmark in results.pose_landmarks.landmark]
-            avg_visibility = sum(visibility_scores) / len(visibility_scores)
-            if avg_visibility < MIN_CONFIDENCE:
-                low_confidence_frames += 1
-        else:
-            low_confidence_frames += 1
+        visibility = landmark_visibility(results.pose_landmarks, visibility_buffer)
+        quality_status = quality_monitor.update(visibility, frame)
+        low_confidence_frames = quality_monitor.low_confidence_frames
         
-        if frame_count > 10 and (low_confidence_frames / frame_count) > 0.3:
+        if quality_status['is_suspect']:
             current_cheating = True
         
         is_cheating = current_cheating
@@ -419,6 +363,8 @@ with mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as
     if low_confidence_frames > 0:
         confidence_rate = ((frame_count - low_confidence_frames) / frame_count) * 100
         print(f"Detection confidence: {confidence_rate:.1f}%")
+    for segment in quality_monitor.suspect_segments():
+        print(f"Suspect segment ({segment['reason']}): {segment['start_time']:.1f}s - {segment['end_time']:.1f}s")
     print("="*50)
 
 cap.release()